@@ -1,5 +1,17 @@
-"""Agent modules for automated procurement processes."""
+"""Agent modules for automated procurement processes.
 
-from .quote_agent import run_quote, QuoteAgent
+Agents pull in IMAP, e-mail and LLM clients, so they are imported on first
+attribute access rather than with the package.
+"""
 
-__all__ = ["run_quote", "QuoteAgent"] 
\ No newline at end of file
+import importlib
+
+__all__ = ["run_quote", "QuoteAgent"]
+
+_LAZY = {"run_quote": ".quote_agent", "QuoteAgent": ".quote_agent"}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
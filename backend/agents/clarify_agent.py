@@ -7,7 +7,6 @@ intelligent follow-up questions when details are missing or unclear.
 import json
 import logging
 from typing import Dict, Any, List, Optional
-import openai
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -26,7 +25,10 @@ class SpecificationClarifier:
     
     def __init__(self, openai_api_key: Optional[str] = None):
         """Initialize the clarifier with OpenAI API key."""
-        self.client = openai.OpenAI(api_key=openai_api_key) if openai_api_key else None
+        self.client = None
+        if openai_api_key:
+            import openai  # deferred: heavy, and only needed with a key
+            self.client = openai.OpenAI(api_key=openai_api_key)
         
     def clarify_specification(
         self, 
@@ -216,6 +218,7 @@ class ClarifyAgent:
     Keep your questions focused and specific."""
 
     def __init__(self, api_key: str):
+        import openai
         openai.api_key = api_key
 
     def chat(self, spec: str) -> Dict:
@@ -230,6 +233,8 @@ class ClarifyAgent:
             - status="question" and a follow-up question
             - status="complete" and the structured spec_json
         """
+        import openai
+
         try:
             response = openai.ChatCompletion.create(
                 model="gpt-4",
@@ -1,9 +1,7 @@
-from openai import OpenAI
 import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 import requests
-from serpapi import Client
 
 @dataclass
 class ProductLead:
@@ -28,6 +26,8 @@ class IntelligentRFQAgent:
         import os
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         self.serpapi_key = serpapi_key or os.getenv('SERPAPI_KEY')
+        # openai and serpapi are imported on first use to keep app import fast
+        from openai import OpenAI
         self.openai_client = OpenAI(api_key=self.openai_api_key)
         
     def analyze_request(self, user_request: str) -> Dict:
@@ -87,6 +87,8 @@ class IntelligentRFQAgent:
                 f"{product_description} quotes online"
             ]
             
+            from serpapi import Client
+
             for query in search_queries[:2]:  # Limit to 2 queries to avoid rate limits
                 client = Client(api_key=self.serpapi_key)
                 results = client.search({
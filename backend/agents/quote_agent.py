@@ -54,6 +54,18 @@ async def store_offer(offer_data: Dict[str, Any], supplier_info: Dict[str, str],
         return None
 
 
+async def store_offers(batch: List[tuple]) -> Optional[Dict[str, Any]]:
+    """Store a batch of ``(offer_data, supplier_info, spec)`` in one transaction."""
+    try:
+        result = await OfferManager.store_offers(batch)
+        for index, error in result["errors"].items():
+            logger.warning(f"Rejected offer {index} in batch: {error}")
+        return result
+    except Exception as e:
+        logger.error(f"Failed to store offer batch: {e}")
+        return None
+
+
 async def process_rfq(spec: str, k: int = 3, poll_duration: int = 30) -> List[Dict[str, Any]]:
     """Process RFQ by finding suppliers, sending requests, and collecting responses."""
     logger.info(f"Processing RFQ for: {spec}")
@@ -116,6 +128,8 @@ async def check_email_responses(spec: str) -> List[Dict[str, Any]]:
             # Search for recent emails
             messages = server.search(['UNSEEN'])
             
+            # Parse every new email first, then store all offers in one batch
+            parsed = []
             for msg_id in messages:
                 try:
                     # Fetch email content
@@ -126,24 +140,30 @@ async def check_email_responses(spec: str) -> List[Dict[str, Any]]:
                     offer_data = extract_offer(raw_email.decode('utf-8'))
                     
                     if offer_data:
-                        # Store offer in database
                         supplier_info = {
                             'name': offer_data.get('supplier_name', 'Unknown'),
                             'email': offer_data.get('supplier_email', ''),
                             'contact': offer_data.get('contact_person', '')
                         }
-                        
-                        offer_id = await store_offer(offer_data, supplier_info, spec)
-                        if offer_id:
-                            offer_data['id'] = offer_id
-                            offers.append(offer_data)
-                        
-                        # Mark as read
-                        server.add_flags([msg_id], ['\\Seen'])
+                        parsed.append((msg_id, offer_data, supplier_info))
                         
                 except Exception as e:
                     logger.error(f"Error processing email {msg_id}: {e}")
                     continue
+            
+            if parsed:
+                result = await store_offers(
+                    [(offer_data, supplier_info, spec) for _, offer_data, supplier_info in parsed]
+                )
+                # On a database error leave the emails unread for the next poll
+                if result is not None:
+                    for (_, offer_data, _), offer_id in zip(parsed, result["ids"]):
+                        if offer_id:
+                            offer_data['id'] = offer_id
+                            offers.append(offer_data)
+                    
+                    # Mark as read
+                    server.add_flags([msg_id for msg_id, _, _ in parsed], ['\\Seen'])
                     
     except Exception as e:
         logger.error(f"Error checking email responses: {e}")
@@ -0,0 +1,392 @@
+"""In-process approximate-nearest-neighbour mirror of the documents table.
+
+The mirror is an IVF (inverted file) index built with NumPy: embeddings are
+normalised, clustered around ``ANN_NLIST`` k-means centroids, and a query only
+scans the lists whose centroids are closest to it. How many lists are scanned
+is derived from a recall target using a recall-vs-probes curve measured on
+the stored vectors at training time.
+
+Arrays live in memory-mapped ``.npy`` files under ``ANN_INDEX_DIR`` so the
+mirror survives restarts; document bodies go to an append-only
+``contents.jsonl`` journal. ``add_doc`` appends to the mirror directly; rows
+written or deleted by other processes are pulled in by :meth:`IVFIndex.sync`.
+The mirror counts as stale once it has not been synced for
+``ANN_MAX_STALENESS`` seconds.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embeddings import DIM
+
+logger = logging.getLogger(__name__)
+
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR")
+ANN_NLIST = int(os.getenv("ANN_NLIST", "64"))
+ANN_RECALL_TARGET = float(os.getenv("ANN_RECALL_TARGET", "0.9"))
+ANN_MAX_STALENESS = float(os.getenv("ANN_MAX_STALENESS", "300"))
+# Seconds of created_at re-read by each sync; must exceed the longest
+# transaction that inserts or deletes documents
+ANN_SYNC_OVERLAP = float(os.getenv("ANN_SYNC_OVERLAP", "60"))
+
+_INITIAL_CAPACITY = 1024
+_KMEANS_ITERATIONS = 10
+_CALIBRATION_QUERIES = 64
+_SYNC_BATCH = 5000
+_MIN_POINTS_PER_LIST = 39  # below this k-means centroids are unreliable
+_ARRAYS = {"_vectors": "vectors.npy", "_ids": "ids.npy", "_lists": "lists.npy"}
+
+# Keyset pages of documents in created_at order (migrations/013 indexes it)
+SYNC_DOCUMENTS_SQL = """
+    SELECT id, content, embedding::text AS embedding, created_at
+    FROM documents
+    WHERE (created_at, id) > (%s, %s)
+    ORDER BY created_at, id
+    LIMIT %s
+"""
+
+SYNC_DELETIONS_SQL = """
+    SELECT id, deleted_at FROM document_deletions WHERE deleted_at >= %s
+"""
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+class IVFIndex:
+    """Inverted-file ANN index over document embeddings."""
+
+    def __init__(
+        self, directory: Optional[str] = ANN_INDEX_DIR, nlist: int = ANN_NLIST
+    ):
+        self.directory = Path(directory) if directory else None
+        self._lock = threading.Lock()
+        self._reset(nlist)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def _reset(self, nlist: int) -> None:
+        self.nlist = nlist
+        self.count = 0
+        # created_at / deleted_at of the newest rows seen by sync()
+        self.synced_until: Optional[datetime] = None
+        self.deleted_until: Optional[datetime] = None
+        self.synced_at = 0.0
+        self.recall_curve: List[float] = []
+        self.contents: Dict[int, str] = {}
+        # Content changes not yet in contents.jsonl, and its line count
+        # (None: rewrite it whole on the next save)
+        self._journal: List[Tuple[int, Optional[str]]] = []
+        self._journal_lines: Optional[int] = None
+        self.centroids: Optional[np.ndarray] = None
+        self._vectors = np.zeros((_INITIAL_CAPACITY, DIM), dtype=np.float32)
+        self._ids = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._lists = np.full(_INITIAL_CAPACITY, -1, dtype=np.int32)
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _load(self) -> None:
+        meta_path = self._path("meta.json")
+        if not meta_path.exists():
+            return
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta.get("dim") != DIM:
+                raise ValueError(f"index dimension {meta.get('dim')} != {DIM}")
+            for attr, name in _ARRAYS.items():
+                setattr(self, attr, np.load(self._path(name), mmap_mode="r+"))
+            if meta.get("trained"):
+                self.centroids = np.load(self._path("centroids.npy"))
+                self.nlist = len(self.centroids)
+            self.count = meta["count"]
+            self.synced_until = _parse_time(meta["synced_until"])
+            self.deleted_until = _parse_time(meta["deleted_until"])
+            self.synced_at = meta["synced_at"]
+            self.recall_curve = meta.get("recall_curve", [])
+            self._load_contents()
+        except Exception as e:
+            logger.warning(f"Discarding unreadable ANN index {self.directory}: {e}")
+            self._reset(self.nlist)
+
+    def _load_contents(self) -> None:
+        lines = self._path("contents.jsonl").read_text().splitlines()
+        for line in lines:
+            doc_id, content = json.loads(line)
+            if content is None:
+                self.contents.pop(doc_id, None)
+            else:
+                self.contents[doc_id] = content
+        self._journal_lines = len(lines)
+
+    def _save_contents(self) -> None:
+        """Append pending changes to the journal, compacting it when mostly dead."""
+        path = self._path("contents.jsonl")
+        lines = self._journal_lines
+        limit = 2 * len(self.contents) + _INITIAL_CAPACITY
+        if lines is None or lines + len(self._journal) > limit:
+            entries = list(self.contents.items())
+            mode, lines = "w", 0
+        else:
+            entries, mode = self._journal, "a"
+        with path.open(mode) as journal:
+            for doc_id, content in entries:
+                journal.write(json.dumps([doc_id, content]) + "\n")
+        self._journal_lines = lines + len(entries)
+        self._journal = []
+
+    def save(self) -> None:
+        """Flush arrays and metadata to disk (no-op for in-memory indexes).
+
+        Called after every :meth:`sync`; rows added locally in between are
+        fetched again by the next sync, so they need not be saved eagerly.
+        """
+        if self.directory is None:
+            return
+        with self._lock:
+            for attr, name in _ARRAYS.items():
+                array = getattr(self, attr)
+                if not isinstance(array, np.memmap):
+                    mapped = np.lib.format.open_memmap(
+                        self._path(name),
+                        mode="w+",
+                        dtype=array.dtype,
+                        shape=array.shape,
+                    )
+                    mapped[:] = array
+                    setattr(self, attr, mapped)
+                    array = mapped
+                array.flush()
+            if self.centroids is not None:
+                np.save(self._path("centroids.npy"), self.centroids)
+            self._save_contents()
+            meta = {
+                "dim": DIM,
+                "count": self.count,
+                "synced_until": _format_time(self.synced_until),
+                "deleted_until": _format_time(self.deleted_until),
+                "synced_at": self.synced_at,
+                "trained": self.centroids is not None,
+                "recall_curve": self.recall_curve,
+            }
+            self._path("meta.json").write_text(json.dumps(meta))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.count + extra
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.zeros((capacity, DIM), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        lists = np.full(capacity, -1, dtype=np.int32)
+        vectors[: self.count] = self._vectors[: self.count]
+        ids[: self.count] = self._ids[: self.count]
+        lists[: self.count] = self._lists[: self.count]
+        # Grown arrays are written back as fresh memmaps on the next save()
+        self._vectors, self._ids, self._lists = vectors, ids, lists
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.full(len(vectors), -1, dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def add(
+        self, ids: Sequence[int], contents: Sequence[str], vectors: np.ndarray
+    ) -> int:
+        """Append documents; ids already present are skipped. Returns rows added."""
+        with self._lock:
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in self.contents]
+            if not keep:
+                return 0
+            vectors = _normalize(np.asarray(vectors, dtype=np.float32)[keep])
+            self._reserve(len(keep))
+            start, end = self.count, self.count + len(keep)
+            self._vectors[start:end] = vectors
+            self._ids[start:end] = [ids[i] for i in keep]
+            self._lists[start:end] = self._assign(vectors)
+            for i in keep:
+                self.contents[int(ids[i])] = contents[i]
+                self._journal.append((int(ids[i]), contents[i]))
+            self.count = end
+            trainable = self.count >= self.nlist * _MIN_POINTS_PER_LIST
+            if self.centroids is None and trainable:
+                self._train()
+            return len(keep)
+
+    def remove(self, ids: Sequence[int]) -> int:
+        """Drop documents by id; returns how many were mirrored."""
+        with self._lock:
+            gone = {int(doc_id) for doc_id in ids} & self.contents.keys()
+            if not gone:
+                return 0
+            keep = ~np.isin(self._ids[: self.count], list(gone))
+            kept = int(keep.sum())
+            for attr in _ARRAYS:
+                array = getattr(self, attr)
+                array[:kept] = array[: self.count][keep]
+            for doc_id in gone:
+                del self.contents[doc_id]
+                self._journal.append((doc_id, None))
+            self.count = kept
+            return len(gone)
+
+    def train(self) -> None:
+        """(Re)cluster all stored vectors and recalibrate the recall curve."""
+        with self._lock:
+            self._train()
+
+    def _train(self) -> None:
+        vectors = self._vectors[: self.count]
+        nlist = min(self.nlist, self.count)
+        if nlist == 0:
+            return
+        rng = np.random.default_rng(0)
+        picks = rng.choice(self.count, min(self.count, nlist * 256), replace=False)
+        sample = vectors[picks]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(_KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        self.centroids = centroids
+        self.nlist = nlist
+        self._lists[: self.count] = self._assign(vectors)
+        self._calibrate(rng)
+
+    def _calibrate(self, rng: np.random.Generator, k: int = 10) -> None:
+        """Measure mean recall@k for every number of probed lists."""
+        vectors = self._vectors[: self.count]
+        sample_size = min(self.count, _CALIBRATION_QUERIES)
+        queries = vectors[rng.choice(self.count, sample_size, replace=False)]
+        lists = self._lists[: self.count]
+        hits = np.zeros(self.nlist)
+        for query in queries:
+            scores = vectors @ query
+            truth = _top_k(scores, k)
+            order = np.argsort(-(self.centroids @ query))
+            rank = np.empty(self.nlist, dtype=np.int64)
+            rank[order] = np.arange(self.nlist)
+            # A true neighbour is found once its list has been probed
+            found = np.bincount(rank[lists[truth]], minlength=self.nlist)
+            hits += np.cumsum(found) / len(truth)
+        self.recall_curve = (hits / len(queries)).tolist()
+
+    def probes_for(self, recall_target: float) -> int:
+        """Smallest number of lists whose measured recall meets the target."""
+        if recall_target >= 1.0 or not self.recall_curve:
+            return self.nlist
+        return int(np.searchsorted(self.recall_curve, recall_target) + 1)
+
+    def is_fresh(self, max_staleness: float = ANN_MAX_STALENESS) -> bool:
+        """Whether the mirror was synced with Postgres recently enough."""
+        return time.time() - self.synced_at <= max_staleness
+
+    def search(
+        self, vector: np.ndarray, k: int = 3, recall_target: float = ANN_RECALL_TARGET
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(content, cosine similarity)`` pairs."""
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        with self._lock:
+            vectors = self._vectors[: self.count]
+            if self.centroids is None:
+                candidates = np.arange(self.count)
+            else:
+                nprobe = min(self.probes_for(recall_target), self.nlist)
+                probed = _top_k(self.centroids @ query, nprobe)
+                candidates = np.flatnonzero(np.isin(self._lists[: self.count], probed))
+            scores = vectors[candidates] @ query
+            best = candidates[_top_k(scores, k)]
+            return [
+                (self.contents[int(self._ids[i])], float(vectors[i] @ query))
+                for i in best
+            ]
+
+    def sync(self, conn) -> int:
+        """Pull documents written or deleted since the last sync.
+
+        SERIAL ids and ``created_at`` are taken when a transaction runs, not
+        when it commits, so a row can become visible after newer ones have
+        been mirrored. Each sync therefore re-reads ``ANN_SYNC_OVERLAP``
+        seconds of ``created_at`` before the newest row already seen (known
+        ids are skipped), and the same for ``document_deletions``
+        (migrations/013). Returns the number of rows added.
+        """
+        overlap = timedelta(seconds=ANN_SYNC_OVERLAP)
+        added = 0
+        cursor = conn.cursor()
+        start = self.synced_until - overlap if self.synced_until else datetime.min
+        position = (start, 0)
+        while True:
+            cursor.execute(SYNC_DOCUMENTS_SQL, (*position, _SYNC_BATCH))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            vectors = np.array(
+                [json.loads(row["embedding"]) for row in rows], dtype=np.float32
+            )
+            added += self.add(
+                [row["id"] for row in rows], [row["content"] for row in rows], vectors
+            )
+            position = (rows[-1]["created_at"], rows[-1]["id"])
+            self.synced_until = max(self.synced_until or position[0], position[0])
+
+        start = self.deleted_until - overlap if self.deleted_until else datetime.min
+        cursor.execute(SYNC_DELETIONS_SQL, (start,))
+        deletions = cursor.fetchall()
+        if deletions:
+            self.remove([row["id"] for row in deletions])
+            newest = max(row["deleted_at"] for row in deletions)
+            self.deleted_until = max(self.deleted_until or newest, newest)
+        self.synced_at = time.time()
+        self.save()
+        return added
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+_index: Optional[IVFIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_ann_index() -> Optional[IVFIndex]:
+    """Return the process-wide mirror, or None when ``ANN_INDEX_DIR`` is unset."""
+    global _index
+    if not ANN_INDEX_DIR:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = IVFIndex(ANN_INDEX_DIR)
+    return _index
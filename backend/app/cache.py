@@ -0,0 +1,161 @@
+"""Small in-process caches shared by the data-access modules."""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    Every entry remembers the generation it was stored in. ``invalidate_all``
+    only bumps the generation counter, so invalidating after a write is O(1)
+    and stale entries are dropped lazily when they are next looked up.
+
+    A reader that fills the cache should read ``generation`` before it
+    queries and pass it to :meth:`set`; the value is then dropped if a write
+    invalidated the cache while the query was running. For caches
+    invalidated key by key, read ``version`` instead: every invalidation
+    bumps it and is remembered (the last ``log_size`` of them), so
+    ``set(..., version=...)`` drops only values whose own key was
+    invalidated in the meantime. Values read from a source that may lag
+    behind the invalidating write (a read replica) can also pass
+    ``quiet_for``: they are dropped if their key was invalidated within
+    that many seconds.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        log_size: int = 1024,
+    ):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.generation = 0
+        self.version = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        # (version, clock time, matches key) of recent invalidations,
+        # oldest first
+        self._log: Deque[Tuple[int, float, Callable[[Hashable], bool]]] = deque(
+            maxlen=log_size
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, generation, value = entry
+                if generation == self.generation and self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        generation: Optional[int] = None,
+        version: Optional[int] = None,
+        quiet_for: Optional[float] = None,
+    ) -> None:
+        """Store ``value``, evicting the least recently used entries if full.
+
+        With ``generation`` (read before computing ``value``), nothing is
+        stored if :meth:`invalidate_all` has run since; with ``version``,
+        nothing is stored if ``key`` has been invalidated since; with
+        ``quiet_for``, nothing is stored if ``key`` was invalidated within
+        the last ``quiet_for`` seconds.
+        """
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if version is not None and self._invalidated_since(key, version):
+                return
+            if quiet_for is not None and self._invalidated_within(key, quiet_for):
+                return
+            self._entries[key] = (self._clock() + self.ttl, self.generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _invalidated_since(self, key: Hashable, version: int) -> bool:
+        if version == self.version:
+            return False
+        if not self._log or self._log[0][0] > version + 1:
+            return True  # older invalidations were forgotten; assume the worst
+        for logged, _, matches in reversed(self._log):
+            if logged <= version:
+                return False
+            if matches(key):
+                return True
+        return False
+
+    def _invalidated_within(self, key: Hashable, seconds: float) -> bool:
+        since = self._clock() - seconds
+        for _, at, matches in reversed(self._log):
+            if at < since:
+                return False
+            if matches(key):
+                return True
+        # The whole log is recent: older invalidations may have been forgotten
+        return len(self._log) == self._log.maxlen
+
+    def _note_invalidation(self, matches: Callable[[Hashable], bool]) -> None:
+        self.version += 1
+        self._log.append((self.version, self._clock(), matches))
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._note_invalidation(lambda cached: cached == key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches ``predicate``."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+            self._note_invalidation(predicate)
+
+    def invalidate_all(self) -> None:
+        """Make every current entry stale."""
+        with self._lock:
+            self.generation += 1
+            self._note_invalidation(lambda cached: True)
+
+    def clear(self) -> None:
+        """Drop all entries, forget past invalidations and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._log.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, the hit ratio and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "generation": self.generation,
+        }
@@ -0,0 +1,227 @@
+"""Content-addressed cache for document embeddings.
+
+Embeddings are keyed by the SHA-256 of the text, so identical RFQ specs and
+quote boilerplate are only embedded once. Lookups go through two layers:
+
+* an in-process LRU bounded by ``EMBEDDING_CACHE_SIZE`` entries, and
+* an optional on-disk store under ``EMBEDDING_CACHE_DIR`` made of
+  memory-mapped ``.npy`` files, so a warm restart skips re-embedding.
+
+The disk store has a fixed number of slots (``EMBEDDING_CACHE_DISK_SLOTS``)
+and overwrites the oldest slot when full. It is meant to be written by a
+single process; give each worker its own directory.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .embeddings import DIM, embed_batch
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR")
+CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+DISK_SLOTS = int(os.getenv("EMBEDDING_CACHE_DISK_SLOTS", "65536"))
+
+KEY_BYTES = 32
+
+
+def content_key(text: str) -> bytes:
+    """Return the content hash used as cache key."""
+    return hashlib.sha256(text.encode()).digest()
+
+
+class DiskEmbeddingStore:
+    """Fixed-capacity embedding store backed by memory-mapped ``.npy`` files.
+
+    ``keys-<dim>.npy`` holds one content hash per slot (all zeros when the
+    slot is empty), ``vectors-<dim>.npy`` the matching float32 rows and
+    ``cursor-<dim>.npy`` the next slot to overwrite.
+    """
+
+    def __init__(self, directory: str, slots: int = DISK_SLOTS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.evictions = 0
+
+        self._keys = self._open("keys", (slots, KEY_BYTES), np.uint8)
+        self._vectors = self._open("vectors", (slots, DIM), np.float32)
+        self._cursor = self._open("cursor", (1,), np.int64)
+        self.slots = self._keys.shape[0]
+
+        self._index: Dict[bytes, int] = {}
+        for slot in np.flatnonzero(self._keys.any(axis=1)):
+            self._index[self._keys[slot].tobytes()] = int(slot)
+
+    def _open(self, name: str, shape, dtype) -> np.memmap:
+        path = self.directory / f"{name}-{DIM}.npy"
+        if path.exists():
+            array = np.load(path, mmap_mode="r+")
+            if array.dtype == dtype and array.shape[1:] == shape[1:]:
+                return array
+            logger.warning(f"Discarding incompatible embedding cache file {path}")
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Return a copy of the stored vector for ``key``, if any."""
+        slot = self._index.get(key)
+        if slot is None:
+            return None
+        return np.array(self._vectors[slot])
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """Store vectors, overwriting the oldest slots once the store is full.
+
+        Writes are ordered so a crash cannot leave a key next to a vector
+        that is not its own: the keys of reused slots are cleared and
+        flushed, then the vectors are written and flushed, and only then
+        are the new keys and the cursor published.
+        """
+        start = int(self._cursor[0])
+        placed: Dict[int, tuple] = {}
+        seen = set()
+        count = 0
+        for key, vector in zip(keys, vectors):
+            if key in self._index or key in seen:
+                continue
+            slot = (start + count) % self.slots
+            if slot in placed:
+                self.evictions += 1
+            placed[slot] = (key, vector)
+            seen.add(key)
+            count += 1
+        if not placed:
+            return
+
+        for slot in placed:
+            old_key = self._keys[slot].tobytes()
+            if old_key in self._index:
+                del self._index[old_key]
+                self.evictions += 1
+            self._keys[slot] = 0
+        self._keys.flush()
+
+        for slot, (_, vector) in placed.items():
+            self._vectors[slot] = vector
+        self._vectors.flush()
+
+        for slot, (key, _) in placed.items():
+            self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+            self._index[key] = slot
+        self._cursor[0] = (start + count) % self.slots
+        self.flush()
+
+    def flush(self) -> None:
+        """Write dirty pages back to the files."""
+        self._keys.flush()
+        self._vectors.flush()
+        self._cursor.flush()
+
+
+class EmbeddingCache:
+    """Two-layer (LRU + memory-mapped disk) cache in front of ``embed_batch``."""
+
+    def __init__(
+        self,
+        max_items: int = CACHE_SIZE,
+        directory: Optional[str] = CACHE_DIR,
+        disk_slots: int = DISK_SLOTS,
+    ):
+        self.max_items = max_items
+        self.disk = DiskEmbeddingStore(directory, disk_slots) if directory else None
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts``, computing only the ones not found in either layer."""
+        keys = [content_key(text) for text in texts]
+        out = np.empty((len(texts), DIM), dtype=np.float32)
+        missing: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in missing:
+                    missing[key].append(i)
+                    self.misses += 1
+                    continue
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                elif self.disk is not None and (vector := self.disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                else:
+                    missing[key] = [i]
+                    self.misses += 1
+                    continue
+                out[i] = vector
+
+        if missing:
+            new_keys = list(missing)
+            fresh = embed_batch([texts[missing[key][0]] for key in new_keys])
+            with self._lock:
+                for key, vector in zip(new_keys, fresh):
+                    out[missing[key]] = vector
+                    # A row view would keep the whole batch matrix alive
+                    self._remember(key, vector.copy())
+                if self.disk is not None:
+                    self.disk.put_many(new_keys, fresh)
+
+        return out
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current sizes."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "memory_evictions": self.evictions,
+            "disk_items": len(self.disk) if self.disk is not None else 0,
+            "disk_evictions": self.disk.evictions if self.disk is not None else 0,
+        }
+
+    def clear(self) -> None:
+        """Drop the in-process layer (the disk store is kept)."""
+        with self._lock:
+            self._memory.clear()
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
+
+
+def cached_embed_batch(texts: Sequence[str]) -> np.ndarray:
+    """``embed_batch`` through the process-wide cache."""
+    return get_embedding_cache().embed_batch(texts)
@@ -1,21 +1,42 @@
 import hashlib
-import struct
+from typing import Sequence
+
+import numpy as np
 
 DIM = 384  # Smaller, more reasonable size
+_ROUNDS = DIM // 8  # Each SHA-256 digest yields 8 big-endian uint32 values
+_WORD = np.dtype(">u4")
+
+
+def _digests(text: str) -> bytes:
+    """Concatenate the SHA-256 digests for every segment of ``text``."""
+    return b"".join(
+        hashlib.sha256(f"{text}:{i}".encode()).digest() for i in range(_ROUNDS)
+    )
+
+
+def _scale(words: np.ndarray) -> np.ndarray:
+    """Map uint32 words to [-1, 1] exactly as the scalar formula does."""
+    return (words.astype(np.float64) / 2**32) * 2 - 1
 
 
 def embed(text: str) -> list[float]:
     """Simple hash-based embedding for testing purposes.
-    
+
     Creates a deterministic embedding without requiring external APIs.
     Uses multiple hash rounds for better distribution.
     """
-    embeddings = []
-    for i in range(DIM // 8):
-        # Use text + index to get different hashes for each segment
-        h = hashlib.sha256(f"{text}:{i}".encode()).digest()
-        for j in range(8):
-            val = struct.unpack(">I", h[j*4:(j+1)*4])[0]
-            # Normalize to [-1,1] range
-            embeddings.append((val / 2**32) * 2 - 1)
-    return embeddings 
\ No newline at end of file
+    words = np.frombuffer(_digests(text), dtype=_WORD)
+    return _scale(words).tolist()
+
+
+def embed_batch(texts: Sequence[str]) -> np.ndarray:
+    """Embed many texts at once.
+
+    Returns a C-contiguous ``(len(texts), DIM)`` float32 matrix. Rows are
+    the float32 rounding of :func:`embed`, which is exactly what pgvector
+    stores for the scalar embedding.
+    """
+    buf = b"".join(_digests(text) for text in texts)
+    words = np.frombuffer(buf, dtype=_WORD).reshape(len(texts), DIM)
+    return np.ascontiguousarray(_scale(words), dtype=np.float32)
@@ -0,0 +1,94 @@
+"""Currency normalization for offer prices.
+
+The email parser records currencies as symbols (``$``, ``£``, ``€``) or
+ISO codes. :func:`currency_code` maps both to an ISO code and
+:func:`to_usd` converts a price with a local rate table: ``fx_rates.json``
+next to this module, or the file named by ``FX_RATES_FILE``. Nothing is
+fetched over the network; refresh the file to update rates.
+
+Offers store the converted price as ``offers.price_usd`` when they are
+written, so it reflects the rates in force when the quote arrived.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+FX_RATES_FILE = os.getenv("FX_RATES_FILE") or str(
+    Path(__file__).with_name("fx_rates.json")
+)
+
+# Symbols the parser extracts; "$" is taken to mean US dollars
+CURRENCY_SYMBOLS = {"$": "USD", "US$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+# Minor units: symbol -> (currency, units per major unit)
+MINOR_UNITS = {"¢": ("USD", 100)}
+
+_rates: Optional[Dict[str, float]] = None
+_lock = threading.Lock()
+
+
+def load_rates(path: str = FX_RATES_FILE) -> Dict[str, float]:
+    """Read ``{"usd_per_unit": {code: rate}}`` from ``path``."""
+    with open(path) as f:
+        table = json.load(f)["usd_per_unit"]
+    return {code.upper(): float(rate) for code, rate in table.items()}
+
+
+def get_rates() -> Dict[str, float]:
+    """USD per unit of each ISO currency, loaded on first use."""
+    global _rates
+    if _rates is None:
+        with _lock:
+            if _rates is None:
+                _rates = load_rates()
+                logger.info(f"Loaded {len(_rates)} FX rates from {FX_RATES_FILE}")
+    return _rates
+
+
+def reload_rates(path: str = FX_RATES_FILE) -> Dict[str, float]:
+    """Re-read the rate table, e.g. after the file was refreshed."""
+    global _rates
+    rates = load_rates(path)
+    with _lock:
+        _rates = rates
+    return rates
+
+
+def currency_code(currency: Optional[str]) -> Optional[str]:
+    """ISO code for a parsed symbol or code; blank means USD."""
+    value = (currency or "").strip()
+    if not value:
+        return "USD"
+    if value in CURRENCY_SYMBOLS:
+        return CURRENCY_SYMBOLS[value]
+    if value in MINOR_UNITS:
+        return MINOR_UNITS[value][0]
+    return value.upper() if value.isalpha() else None
+
+
+def usd_rate(
+    currency: Optional[str], rates: Optional[Mapping[str, float]] = None
+) -> Optional[float]:
+    """USD value of one unit of ``currency``, or None if it is unknown."""
+    rate = (rates if rates is not None else get_rates()).get(currency_code(currency))
+    if rate is None:
+        return None
+    value = (currency or "").strip()
+    if value in MINOR_UNITS:
+        rate /= MINOR_UNITS[value][1]
+    return rate
+
+
+def to_usd(price, currency: Optional[str]) -> Optional[float]:
+    """``price`` in USD (4 decimals), or None without a price or known rate."""
+    if price is None:
+        return None
+    rate = usd_rate(currency)
+    if rate is None:
+        return None
+    return round(float(price) * rate, 4)
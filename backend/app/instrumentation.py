@@ -0,0 +1,215 @@
+"""Per-statement latency instrumentation for the database layer.
+
+Connections opened by :mod:`backend.app.db` use the cursor classes below,
+so every statement is timed and recorded in a histogram keyed by its
+fingerprint: the SQL with literals and placeholders replaced by ``?`` and
+whitespace collapsed, so the same query with different arguments lands in
+the same bucket. Statements slower than ``SLOW_QUERY_MS`` are written to the
+``backend.app.slow_queries`` logger with their parameters redacted.
+"""
+
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import psycopg
+
+slow_query_logger = logging.getLogger("backend.app.slow_queries")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'"  # string literals
+    r"|%\(\w+\)s|%s"  # psycopg placeholders
+    r"|\$\d+"  # server-side placeholders
+    r"|\b\d+(?:\.\d+)?\b"  # numbers
+)
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# Multi-row VALUES: any number of rows counts as one statement shape
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    """Normalize ``query`` so calls that differ only in arguments match."""
+    text = _COMMENTS.sub(" ", query)
+    text = _LITERALS.sub("?", text)
+    text = _LISTS.sub("(...)", text)
+    text = _ROWS.sub("(...), ...", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def redact(params: Any) -> Any:
+    """Replace parameter values by their type names, keeping the shape."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in params.items()}
+    return [f"<{type(value).__name__}>" for value in params]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+        }
+
+
+class QueryStats:
+    """Latency histograms keyed by query fingerprint."""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        query: str,
+        seconds: float,
+        params: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        key = fingerprint(query)
+        ms = seconds * 1000
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(ms)
+        if ms >= self.slow_ms:
+            outcome = f" ({type(error).__name__})" if error is not None else ""
+            slow_query_logger.warning(
+                f"Slow query {ms:.1f} ms{outcome}: {key} params={redact(params)}"
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-fingerprint latency summary, slowest total time first."""
+        with self._lock:
+            items = sorted(
+                self._histograms.items(), key=lambda item: -item[1].total_ms
+            )
+            return {key: histogram.as_dict() for key, histogram in items}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+query_stats = QueryStats()
+
+
+def _query_text(query: Any, cursor) -> str:
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode(errors="replace")
+    try:
+        return query.as_string(cursor.connection)
+    except Exception:
+        return str(query)
+
+
+class InstrumentedCursor(psycopg.Cursor):
+    """Cursor that records the latency of every statement."""
+
+    def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return super().execute(query, params, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            query_stats.record(
+                _query_text(query, self), time.perf_counter() - start, params, error
+            )
+
+    def executemany(self, query, params_seq, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return super().executemany(query, params_seq, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            query_stats.record(
+                _query_text(query, self), time.perf_counter() - start, None, error
+            )
+
+
+class AsyncInstrumentedCursor(psycopg.AsyncCursor):
+    """Async counterpart of :class:`InstrumentedCursor`."""
+
+    async def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return await super().execute(query, params, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            query_stats.record(
+                _query_text(query, self), time.perf_counter() - start, params, error
+            )
+
+    async def executemany(self, query, params_seq, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            query_stats.record(
+                _query_text(query, self), time.perf_counter() - start, None, error
+            )
+
+
+def query_latency_stats() -> Dict[str, Dict[str, float]]:
+    """Latency summary of every statement fingerprint seen so far."""
+    return query_stats.snapshot()
+
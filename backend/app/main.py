@@ -1,12 +1,23 @@
 """Main FastAPI application entry point with improved error handling."""
 
-import os
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-import psycopg
-from backend.app.db import DB_DSN
+from backend.app.db import (
+    close_async_pool,
+    close_pool,
+    get_async_connection,
+    open_async_pool,
+    open_pool,
+    pool_stats,
+    request_scope,
+)
+from backend.app.instrumentation import query_latency_stats
+from backend.app.prepared import statement_stats
+from backend.app.readiness import readiness
 from pydantic import BaseModel          # ← ADD THIS
 
 
@@ -19,20 +30,27 @@ logger = logging.getLogger(__name__)
 
 
 async def check_database_connection():
-    """Check database connection with retry logic."""
+    """Warm both connection pools concurrently, retrying with backoff.
+
+    Waits for each pool's minimum connections without blocking the event
+    loop (the sync pool is awaited in a worker thread).
+    """
     max_retries = 5
     retry_delay = 2
     
     for attempt in range(max_retries):
         try:
-            conn = psycopg.connect(DB_DSN)
-            conn.close()
+            await asyncio.gather(
+                asyncio.to_thread(open_pool, True),
+                open_async_pool(wait=True),
+            )
+            async with get_async_connection() as conn:
+                await conn.execute("SELECT 1")
             logger.info("Database connection successful")
             return True
         except Exception as e:
             logger.warning(f"Database connection attempt {attempt + 1} failed: {e}")
             if attempt < max_retries - 1:
-                import asyncio
                 await asyncio.sleep(retry_delay)
                 retry_delay *= 2  # Exponential backoff
             else:
@@ -42,16 +60,33 @@ async def check_database_connection():
     return False
 
 
+async def warm_up_database():
+    """Background startup task; ``/ready`` reports the database until it succeeds.
+    
+    Once connected, also makes sure the upcoming monthly offers partitions
+    exist.
+    """
+    if not await check_database_connection():
+        logger.error("Could not establish database connection. Application may not function properly.")
+        return
+    try:
+        from backend.app.offers import ensure_offer_partitions
+        await ensure_offer_partitions()
+    except Exception as e:
+        logger.warning(f"Could not create upcoming offer partitions: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     logger.info("Starting up application...")
     
-    # Check database connection
-    db_connected = await check_database_connection()
-    if not db_connected:
-        logger.error("Could not establish database connection. Application may not function properly.")
+    # Open the connection pools (connections are established in the
+    # background) and warm them without holding up startup
+    open_pool()
+    await open_async_pool()
+    warm_up = asyncio.create_task(warm_up_database())
     
     logger.info("Application startup complete")
     
@@ -59,6 +94,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application...")
+    warm_up.cancel()
+    close_pool()
+    await close_async_pool()
 
 
 # Create FastAPI app
@@ -79,6 +117,13 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def database_request_scope(request: Request, call_next):
+    """Give each request its own read-your-writes routing state."""
+    with request_scope():
+        return await call_next(request)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -87,29 +132,98 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    try:
-        # Quick database connection test
-        conn = psycopg.connect(DB_DSN)
-        conn.close()
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        raise HTTPException(status_code=503, detail="Service unavailable")
+    """Liveness probe: the process is up and serving requests.
+
+    Does no I/O, so it stays cheap however often it is polled; dependency
+    checks live in ``/ready``.
+    """
+    return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: database, SMTP and IMAP reachable (cached briefly).
+
+    Returns only the cached report; diagnostic counters live in ``/stats``.
+    """
+    report = await readiness()
+    if not report["ready"]:
+        raise HTTPException(status_code=503, detail=report)
+    return report
+
+
+@app.get("/stats")
+async def service_stats():
+    """Pool, prepared-statement, query-latency and offer-cache counters."""
+    from backend.app.offers import offer_cache_stats
+    return {
+        "pools": pool_stats(),
+        "statements": statement_stats(),
+        "queries": query_latency_stats(),
+        "offer_cache": offer_cache_stats(),
+    }
 
 
 @app.get("/api/offers")
-async def get_offers():
-    """Get all offers."""
+async def get_offers(
+    spec: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """List offers newest first, optionally for one spec.
+    
+    Pass the returned ``next_cursor`` back as ``cursor`` for the next page.
+    """
     try:
-        from backend.app.offers import OfferManager
-        offers = await OfferManager.get_offers_by_spec("", limit=100)
-        return {"offers": offers}
+        from backend.app.offers import InvalidCursorError, OfferManager, next_cursor
+        if spec:
+            offers = await OfferManager.get_offers_by_spec(
+                spec, limit=limit, after=cursor
+            )
+        else:
+            offers = await OfferManager.search_offers(limit=limit, after=cursor)
+        return {"offers": offers, "next_cursor": next_cursor(offers, limit)}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching offers: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+class OfferStatusBatch(BaseModel):
+    """Move several offers to one status, e.g. reject the losing bids."""
+    ids: List[int]
+    status: str
+    notes: Optional[str] = None
+
+
+@app.post("/api/offers/status")
+async def update_offer_statuses(batch: OfferStatusBatch):
+    """Apply one status transition to many offers in a single transaction.
+    
+    Returns a result per id; ids whose transition is not allowed or that do
+    not exist are reported, not failed.
+    """
+    from backend.app.offers import OFFER_TRANSITIONS, OfferManager
+    if batch.status not in OFFER_TRANSITIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status. Must be one of: {list(OFFER_TRANSITIONS)}",
+        )
+    try:
+        results = await OfferManager.update_offer_statuses(
+            batch.ids, batch.status, batch.notes
+        )
+    except Exception as e:
+        logger.error(f"Error updating offer statuses: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    return {
+        "status": batch.status,
+        "updated": sum(result["result"] == "updated" for result in results),
+        "results": results,
+    }
+
+
 @app.get("/api/offers/{offer_id}")
 async def get_offer(offer_id: int):
     """Get specific offer by ID."""
@@ -130,8 +244,6 @@ if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
-if __name__ == "__main__":
-
 # ─────────────────────────────  NEW CODE  ────────────────────────────────
 class RFQRequest(BaseModel):
     """Payload sent by the React front-end."""
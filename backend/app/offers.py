@@ -1,25 +1,321 @@
 """Offer management and database operations for supplier quotes.
 
 This module handles all database operations related to supplier offers,
-including storing, retrieving, updating, and managing offer data.
+including storing, retrieving, updating, and managing offer data. All
+queries run on psycopg's ``AsyncConnection`` so they never block the
+event loop.
 """
 
+import base64
+import binascii
+import json
 import logging
-from typing import Dict, Any, List, Optional, Union
+import math
+import os
+import unicodedata
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 import psycopg
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, tuple_row
 
-from backend.app.db import get_connection
+from backend.app.cache import TTLCache
+from backend.app.db import (
+    REPLICA_LAG_CHECK_INTERVAL,
+    REPLICA_MAX_LAG,
+    from_replica,
+    get_async_connection,
+    request_wrote,
+)
+from backend.app.fx import to_usd
+from backend.app.prepared import statements
+from backend.app.ranking import LandedCostConfig, OfferArrays, rank_offers
 
 logger = logging.getLogger(__name__)
 
+OFFER_CACHE_SIZE = int(os.getenv("OFFER_CACHE_SIZE", "4096"))
+OFFER_CACHE_TTL = float(os.getenv("OFFER_CACHE_TTL", "60"))
+# Monthly offers partitions kept ahead of the current month (migrations/011)
+OFFER_PARTITION_MONTHS_AHEAD = int(os.getenv("OFFER_PARTITION_MONTHS_AHEAD", "3"))
+
+# Rows per multi-row INSERT in store_offers (15 parameters per row)
+STORE_BATCH_CHUNK = 1000
+
+_OFFER_COLUMNS = """
+    supplier_name, supplier_email, supplier_contact,
+    product_spec, spec_key, price, price_usd, currency, lead_time, minimum_order,
+    product_description, notes, status, created_at
+"""
+_OFFER_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+# An offer row preceded by its id
+_OFFER_ID_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+
+# store_offers draws each row's id before inserting it, so ids map back to
+# the batch explicitly; the id column may be serial or identity
+OFFER_IDS_SQL = """
+    SELECT nextval(pg_get_serial_sequence('offers', 'id')) AS id
+    FROM generate_series(1, %s)
+"""
+
+# Status changes allowed by update_offer_statuses: current -> new statuses
+OFFER_TRANSITIONS = {
+    "pending": {"accepted", "rejected", "expired"},
+    "accepted": {"expired"},
+    "rejected": set(),
+    "expired": set(),
+}
+
+# Log-scale price histogram of offer_spec_summary (migrations/009):
+# bucket i covers [PRICE_HISTOGRAM_FLOOR * 10**(i/20), ... * 10**((i+1)/20))
+PRICE_HISTOGRAM_BUCKETS = 160
+PRICE_HISTOGRAM_PER_DECADE = 20
+PRICE_HISTOGRAM_FLOOR = 0.01
+SUMMARY_PERCENTILES = {"p10_price": 0.10, "p50_price": 0.50, "p90_price": 0.90}
+
+# Totals over the matching offer_spec_summary rows, always one row; the
+# histograms are added bucket by bucket in SQL rather than in Python
+SUMMARY_SQL = """
+    WITH matched AS (
+        SELECT * FROM offer_spec_summary {where}
+    ),
+    buckets AS (
+        SELECT h.bucket, SUM(h.count)::BIGINT AS count
+        FROM matched,
+             unnest(matched.price_histogram) WITH ORDINALITY AS h(count, bucket)
+        GROUP BY h.bucket
+    )
+    SELECT COALESCE(SUM(total_offers), 0) AS total_offers,
+           COALESCE(SUM(pending_offers), 0) AS pending_offers,
+           COALESCE(SUM(accepted_offers), 0) AS accepted_offers,
+           COALESCE(SUM(rejected_offers), 0) AS rejected_offers,
+           COALESCE(SUM(priced_offers), 0) AS priced_offers,
+           COALESCE(SUM(price_sum), 0) AS price_sum,
+           MIN(min_price) AS min_price,
+           MAX(max_price) AS max_price,
+           (SELECT array_agg(count ORDER BY bucket) FROM buckets) AS price_histogram
+    FROM matched
+"""
+
+# Text search served by the pg_trgm GIN indexes (migrations/008): substring
+# matches via ILIKE, fuzzy word matches via the <% operator. Takes the
+# pattern three times, then the raw term three times.
+TEXT_MATCH_SQL = """(
+    product_spec ILIKE %s OR supplier_name ILIKE %s OR product_description ILIKE %s
+    OR %s <%% product_spec OR %s <%% supplier_name OR %s <%% product_description
+)"""
+# Best word similarity of the term to any searched column (term three times)
+MATCH_SCORE_SQL = """GREATEST(
+    word_similarity(%s, product_spec),
+    word_similarity(%s, supplier_name),
+    word_similarity(%s, product_description)
+)"""
+
+# Hot read paths run as named server-side prepared statements, so pooled
+# connections plan them once instead of on every request.
+OFFER_BY_ID = "offers.by_id"
+OFFERS_BY_SPEC = "offers.by_spec"
+OFFERS_BY_SPEC_AFTER = "offers.by_spec_after"
+CHEAPEST_BY_SPEC = "offers.cheapest_by_spec"
+RANKING_CANDIDATES = "offers.ranking_candidates"
+OFFERS_BY_IDS = "offers.by_ids"
+
+statements.register(OFFER_BY_ID, "SELECT * FROM offers WHERE id = %s")
+# Spec lookups take canonical_spec(spec) and read the (spec_key, created_at
+# DESC, id DESC) index in order, newest first (migrations/010)
+statements.register(
+    OFFERS_BY_SPEC,
+    """
+    SELECT * FROM offers
+    WHERE spec_key = %s
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s
+    """,
+)
+# offers is partitioned by month on created_at (migrations/011). Row
+# comparisons do not prune partitions, so keyset pages repeat the cursor's
+# created_at as a plain upper bound and skip every newer month.
+statements.register(
+    OFFERS_BY_SPEC_AFTER,
+    """
+    SELECT * FROM offers
+    WHERE spec_key = %s AND created_at <= %s AND (created_at, id) < (%s, %s)
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s
+    """,
+)
+# Compared in USD across currencies (price_usd, migrations/012)
+statements.register(
+    CHEAPEST_BY_SPEC,
+    """
+    SELECT * FROM offers
+    WHERE spec_key = %s AND price_usd IS NOT NULL
+    ORDER BY price_usd ASC
+    LIMIT %s
+    """,
+)
+# Only the columns the landed-cost score needs, as numbers (ranking.py);
+# minimum_order keeps its first number, so "500 units" counts as 500
+statements.register(
+    RANKING_CANDIDATES,
+    """
+    SELECT id, price::float8, COALESCE(currency, ''), lead_time::float8,
+           substring(minimum_order::text from '[0-9]+(?:[.][0-9]+)?')::float8,
+           price_usd::float8
+    FROM offers
+    WHERE spec_key = %s AND price IS NOT NULL
+    """,
+)
+statements.register(OFFERS_BY_IDS, "SELECT * FROM offers WHERE id = ANY(%s)")
+
+
+def canonical_spec(spec: Optional[str]) -> str:
+    """Lookup key for a free-text product spec.
+    
+    Unicode-normalized (NFKC), case-folded, with whitespace runs collapsed
+    to one space and trimmed, so "Eco tote bags" and "eco  tote bags "
+    share a key. Stored as ``offers.spec_key``; changing this function
+    requires rerunning ``tools/backfill_spec_keys.py --all``.
+    """
+    if not spec:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", spec).casefold().split())
+
+
+# Read-through cache for offer lookups, keyed ("id", offer_id) and
+# ("spec", spec, ...). Writes through OfferManager invalidate the affected
+# keys; the TTL bounds staleness from writers that bypass it. Misses are
+# read through a replica; a fill is dropped if its key was invalidated while
+# the read was in flight, or, for replica reads, recently enough that the
+# replica may not have replayed the write yet. A request that has written
+# skips the cache and reads the primary, so it always sees its own writes.
+_offer_cache = TTLCache(OFFER_CACHE_SIZE, OFFER_CACHE_TTL)
+# How long after an invalidation a replica may still return the old rows
+REPLICA_STALENESS = REPLICA_MAX_LAG + REPLICA_LAG_CHECK_INTERVAL
+
+
+def invalidate_offer(
+    offer_id: Optional[int] = None, spec: Optional[str] = None
+) -> None:
+    """Drop cached entries for an offer id and/or every entry of a spec."""
+    if offer_id is not None:
+        _offer_cache.invalidate(("id", offer_id))
+    if spec is not None:
+        key = canonical_spec(spec)
+        _offer_cache.invalidate_where(
+            lambda cached: cached[0] == "spec" and cached[1] == key
+        )
+
+
+def _cached(key):
+    """Cached value for ``key``, or None on a miss or after a write."""
+    if request_wrote():
+        return None
+    return _offer_cache.get(key)
+
+
+def _fill(key, value, version: int, replica: bool) -> None:
+    """Cache ``value`` unless its key was invalidated after ``version``.
+
+    Values read from a replica are also dropped while the key's last
+    invalidation is younger than ``REPLICA_STALENESS``.
+    """
+    quiet_for = REPLICA_STALENESS if replica else None
+    _offer_cache.set(key, value, version=version, quiet_for=quiet_for)
+
+
+def offer_cache_stats() -> Dict[str, float]:
+    """Hit/miss counters and size of the offer cache."""
+    return _offer_cache.stats()
+
+
+def _copies(offers) -> List[Dict[str, Any]]:
+    """Fresh dicts so callers cannot mutate cached rows."""
+    return [dict(offer) for offer in offers]
+
 
 class OfferError(Exception):
     """Exception raised for offer-related errors."""
     pass
 
 
+class InvalidCursorError(OfferError):
+    """Exception raised for a malformed or tampered page cursor."""
+    pass
+
+
+def encode_cursor(offer: Dict[str, Any]) -> str:
+    """Opaque page token pointing just past ``offer`` in listing order.
+    
+    Ranked search results also carry their ``match_score`` in the token.
+    """
+    key = {"created_at": offer["created_at"].isoformat(), "id": offer["id"]}
+    if offer.get("match_score") is not None:
+        key["match_score"] = float(offer["match_score"])
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple:
+    """Inverse of :func:`encode_cursor`.
+    
+    Returns the ``(created_at, id)`` keyset, or ``(match_score, created_at,
+    id)`` for a ranked search token.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key = json.loads(raw)
+        keyset = (datetime.fromisoformat(key["created_at"]), int(key["id"]))
+        if "match_score" in key:
+            return (float(key["match_score"]), *keyset)
+        return keyset
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid page cursor: {e}")
+
+
+def price_bucket(price: float) -> int:
+    """Histogram bucket of ``price``; mirrors ``offer_price_bucket`` in SQL."""
+    if price <= PRICE_HISTOGRAM_FLOOR:
+        return 0
+    decades = math.log10(price / PRICE_HISTOGRAM_FLOOR)
+    bucket = math.floor(PRICE_HISTOGRAM_PER_DECADE * decades)
+    return min(PRICE_HISTOGRAM_BUCKETS - 1, bucket)
+
+
+def histogram_percentile(
+    histogram: Sequence[int],
+    q: float,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> Optional[float]:
+    """Estimate the ``q`` price quantile from a summary price histogram.
+    
+    Returns the geometric midpoint of the bucket holding the quantile,
+    clamped to the known min/max; accurate to about half a bucket (~6%).
+    """
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        seen += count
+        if count and seen >= rank:
+            break
+    exponent = (bucket + 0.5) / PRICE_HISTOGRAM_PER_DECADE
+    estimate = PRICE_HISTOGRAM_FLOOR * 10 ** exponent
+    if min_price is not None:
+        estimate = max(estimate, float(min_price))
+    if max_price is not None:
+        estimate = min(estimate, float(max_price))
+    return estimate
+
+
+def next_cursor(offers: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Token for the page after ``offers``, or None when it was the last."""
+    if offers and len(offers) >= limit:
+        return encode_cursor(offers[-1])
+    return None
+
+
 class OfferManager:
     """Manager class for supplier offer operations."""
     
@@ -56,36 +352,22 @@ class OfferManager:
         try:
             OfferManager._validate_offer_data(offer_data)
             
-            with get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cursor:
+            async with get_async_connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
                     # Insert offer
-                    insert_query = """
-                        INSERT INTO offers (
-                            supplier_name, supplier_email, supplier_contact,
-                            product_spec, price, currency, lead_time, minimum_order,
-                            product_description, notes, status, created_at
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        ) RETURNING id
-                    """
+                    insert_query = (
+                        f"INSERT INTO offers ({_OFFER_COLUMNS}) "
+                        f"VALUES {_OFFER_ROW} RETURNING id"
+                    )
                     
-                    cursor.execute(insert_query, (
-                        supplier_info.get('name', ''),
-                        supplier_info.get('email', ''),
-                        supplier_info.get('contact', ''),
-                        spec,
-                        offer_data.get('price'),
-                        offer_data.get('currency', 'USD'),
-                        offer_data.get('lead_time'),
-                        offer_data.get('minimum_order'),
-                        offer_data.get('product_description', ''),
-                        offer_data.get('notes', ''),
-                        'pending',
-                        datetime.now()
-                    ))
-                    
-                    result = cursor.fetchone()
-                    conn.commit()
+                    await cursor.execute(
+                        insert_query,
+                        OfferManager._offer_row(offer_data, supplier_info, spec)
+                    )
+                    
+                    result = await cursor.fetchone()
+                    await conn.commit()
+                    invalidate_offer(spec=spec)
                     
                     if result:
                         logger.info(f"Successfully stored offer with ID: {result['id']}")
@@ -101,37 +383,221 @@ class OfferManager:
         return None
     
     @staticmethod
-    async def get_offers_by_spec(spec: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Retrieve offers for a specific product specification."""
+    def _offer_row(
+        offer_data: Dict[str, Any], supplier_info: Dict[str, str], spec: str
+    ) -> Tuple:
+        """Column values for one offer, in ``_OFFER_COLUMNS`` order."""
+        currency = offer_data.get('currency', 'USD')
+        return (
+            supplier_info.get('name', ''),
+            supplier_info.get('email', ''),
+            supplier_info.get('contact', ''),
+            spec,
+            canonical_spec(spec),
+            offer_data.get('price'),
+            to_usd(offer_data.get('price'), currency),
+            currency,
+            offer_data.get('lead_time'),
+            offer_data.get('minimum_order'),
+            offer_data.get('product_description', ''),
+            offer_data.get('notes', ''),
+            'pending',
+            datetime.now()
+        )
+    
+    @staticmethod
+    async def store_offers(
+        batch: Sequence[Tuple[Dict[str, Any], Dict[str, str], str]]
+    ) -> Dict[str, Any]:
+        """Store many offers in one transaction.
+        
+        ``batch`` holds ``(offer_data, supplier_info, spec)`` tuples, the
+        arguments of :meth:`store_offer`. Every row is validated first; rows
+        that fail are reported in ``errors`` (input index -> message) and
+        skipped, the rest are inserted with multi-row INSERTs and committed
+        together. ``ids`` is aligned with ``batch``: the new offer id, or
+        None for a rejected row. Database errors abort the whole batch.
+        """
+        ids: List[Optional[int]] = [None] * len(batch)
+        errors: Dict[int, str] = {}
+        valid: List[Tuple[int, Tuple]] = []
+        for index, item in enumerate(batch):
+            try:
+                offer_data, supplier_info, spec = item
+                OfferManager._validate_offer_data(offer_data)
+                row = OfferManager._offer_row(offer_data, supplier_info, spec)
+                valid.append((index, row))
+            except (OfferError, ValueError, TypeError, AttributeError) as e:
+                errors[index] = str(e)
+        
+        if not valid:
+            return {"ids": ids, "errors": errors}
+        
         try:
-            with get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cursor:
-                    query = """
-                        SELECT * FROM offers 
-                        WHERE product_spec = %s 
-                        ORDER BY created_at DESC 
-                        LIMIT %s
-                    """
-                    cursor.execute(query, (spec, limit))
-                    offers = cursor.fetchall()
+            async with get_async_connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    for start in range(0, len(valid), STORE_BATCH_CHUNK):
+                        chunk = valid[start:start + STORE_BATCH_CHUNK]
+                        await cursor.execute(OFFER_IDS_SQL, (len(chunk),))
+                        new_ids = [row['id'] for row in await cursor.fetchall()]
+                        query = (
+                            f"INSERT INTO offers (id, {_OFFER_COLUMNS}) "
+                            "OVERRIDING SYSTEM VALUE VALUES "
+                            + ", ".join([_OFFER_ID_ROW] * len(chunk))
+                        )
+                        params = [
+                            value
+                            for offer_id, (_, row) in zip(new_ids, chunk)
+                            for value in (offer_id, *row)
+                        ]
+                        await cursor.execute(query, params)
+                        for (index, _), offer_id in zip(chunk, new_ids):
+                            ids[index] = offer_id
+                    await conn.commit()
+                    for spec in {row[3] for _, row in valid}:
+                        invalidate_offer(spec=spec)
                     
-                    return [dict(offer) for offer in offers]
+        except psycopg.Error as e:
+            logger.error(f"Database error storing offer batch: {e}")
+            raise OfferError(f"Failed to store offers: {e}")
+        
+        logger.info(f"Stored {len(valid)} offers, rejected {len(errors)}")
+        return {"ids": ids, "errors": errors}
+    
+    @staticmethod
+    async def get_offers_by_spec(
+        spec: str, limit: int = 50, after: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve offers for a specific product specification, newest first.
+        
+        Pass the token from :func:`next_cursor` as ``after`` to get the next
+        page; pages are keyed on ``(created_at, id)``, not OFFSET.
+        """
+        keyset = decode_cursor(after) if after else None
+        if keyset and len(keyset) != 2:
+            raise InvalidCursorError("Invalid page cursor: not a listing cursor")
+        key = canonical_spec(spec)
+        cache_key = ("spec", key, "page", limit, after)
+        cached = _cached(cache_key)
+        if cached is not None:
+            return _copies(cached)
+        version = _offer_cache.version
+        try:
+            async with get_async_connection(readonly=True) as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    if keyset:
+                        await statements.execute(
+                            cursor,
+                            OFFERS_BY_SPEC_AFTER,
+                            (key, keyset[0], *keyset, limit),
+                        )
+                    else:
+                        await statements.execute(
+                            cursor, OFFERS_BY_SPEC, (key, limit)
+                        )
+                    offers = await cursor.fetchall()
+                    
+                    _fill(
+                        cache_key, tuple(_copies(offers)), version,
+                        from_replica(conn),
+                    )
+                    return _copies(offers)
                     
         except psycopg.Error as e:
             logger.error(f"Database error retrieving offers: {e}")
             raise OfferError(f"Failed to retrieve offers: {e}")
     
+    @staticmethod
+    async def get_cheapest_offers(spec: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Retrieve the cheapest priced offers for a product specification."""
+        key = canonical_spec(spec)
+        cache_key = ("spec", key, "cheapest", limit)
+        cached = _cached(cache_key)
+        if cached is not None:
+            return _copies(cached)
+        version = _offer_cache.version
+        try:
+            async with get_async_connection(readonly=True) as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await statements.execute(cursor, CHEAPEST_BY_SPEC, (key, limit))
+                    offers = await cursor.fetchall()
+                    
+                    _fill(
+                        cache_key, tuple(_copies(offers)), version,
+                        from_replica(conn),
+                    )
+                    return _copies(offers)
+                    
+        except psycopg.Error as e:
+            logger.error(f"Database error retrieving offers: {e}")
+            raise OfferError(f"Failed to retrieve offers: {e}")
+    
+    @staticmethod
+    async def get_landed_cost_offers(
+        spec: str, limit: int = 3, quantity: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Best offers for a spec by landed cost rather than raw price.
+        
+        Every priced offer of the spec is scored by
+        :func:`backend.app.ranking.rank_offers` (currency, lead time and,
+        given ``quantity``, minimum order); only the winners are fetched in
+        full. Each offer carries its score as ``landed_cost`` (USD/unit).
+        """
+        key = canonical_spec(spec)
+        cache_key = ("spec", key, "landed", limit, quantity)
+        cached = _cached(cache_key)
+        if cached is not None:
+            return _copies(cached)
+        version = _offer_cache.version
+        try:
+            async with get_async_connection(readonly=True) as conn:
+                async with conn.cursor(row_factory=tuple_row) as cursor:
+                    await statements.execute(cursor, RANKING_CANDIDATES, (key,))
+                    candidates = OfferArrays.from_rows(await cursor.fetchall())
+                ranked = rank_offers(
+                    candidates, limit, LandedCostConfig(quantity=quantity)
+                )
+                if not ranked:
+                    return []
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    ids = [offer["id"] for offer in ranked]
+                    await statements.execute(cursor, OFFERS_BY_IDS, (ids,))
+                    rows = {row["id"]: row for row in await cursor.fetchall()}
+                replica = from_replica(conn)
+                    
+        except psycopg.Error as e:
+            logger.error(f"Database error ranking offers: {e}")
+            raise OfferError(f"Failed to rank offers: {e}")
+        
+        offers = [
+            {**rows[offer["id"]], "landed_cost": offer["landed_cost"]}
+            for offer in ranked
+            if offer["id"] in rows
+        ]
+        _fill(cache_key, tuple(_copies(offers)), version, replica)
+        return offers
+    
     @staticmethod
     async def get_offer_by_id(offer_id: int) -> Optional[Dict[str, Any]]:
-        """Retrieve a specific offer by ID."""
+        """Retrieve a specific offer by ID.
+        
+        Found offers are cached; misses are not, so a newly stored id is
+        visible immediately.
+        """
+        cached = _cached(("id", offer_id))
+        if cached is not None:
+            return dict(cached)
+        version = _offer_cache.version
         try:
-            with get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cursor:
-                    query = "SELECT * FROM offers WHERE id = %s"
-                    cursor.execute(query, (offer_id,))
-                    offer = cursor.fetchone()
+            async with get_async_connection(readonly=True) as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await statements.execute(cursor, OFFER_BY_ID, (offer_id,))
+                    offer = await cursor.fetchone()
                     
-                    return dict(offer) if offer else None
+                    if not offer:
+                        return None
+                    _fill(("id", offer_id), dict(offer), version, from_replica(conn))
+                    return dict(offer)
                     
         except psycopg.Error as e:
             logger.error(f"Database error retrieving offer: {e}")
@@ -146,33 +612,119 @@ class OfferManager:
             raise OfferError(f"Invalid status. Must be one of: {valid_statuses}")
         
         try:
-            with get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cursor:
+            async with get_async_connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
                     query = """
                         UPDATE offers 
                         SET status = %s, notes = COALESCE(%s, notes), updated_at = %s
                         WHERE id = %s
+                        RETURNING spec_key
                     """
-                    cursor.execute(query, (status, notes, datetime.now(), offer_id))
-                    conn.commit()
+                    await cursor.execute(query, (status, notes, datetime.now(), offer_id))
+                    updated = await cursor.fetchone()
+                    await conn.commit()
                     
-                    return cursor.rowcount > 0
+                    if not updated:
+                        return False
+                    invalidate_offer(offer_id, updated['spec_key'])
+                    return True
                     
         except psycopg.Error as e:
             logger.error(f"Database error updating offer status: {e}")
             raise OfferError(f"Failed to update offer status: {e}")
     
+    @staticmethod
+    async def update_offer_statuses(
+        offer_ids: Sequence[int], status: str, notes: str = None
+    ) -> List[Dict[str, Any]]:
+        """Move many offers to ``status`` in one transaction.
+        
+        The rows are locked (in id order, so overlapping batches cannot
+        deadlock) and checked against ``OFFER_TRANSITIONS``, then
+        every allowed id is updated by a single ``id = ANY(...)`` statement.
+        Returns one result per distinct id, in input order:
+        ``{"id", "result", "previous_status"}`` where ``result`` is
+        ``updated``, ``unchanged`` (already in ``status``), ``not_found`` or
+        ``invalid_transition``. Database errors roll back the whole batch.
+        """
+        if status not in OFFER_TRANSITIONS:
+            raise OfferError(
+                f"Invalid status. Must be one of: {list(OFFER_TRANSITIONS)}"
+            )
+        ids = list(dict.fromkeys(offer_ids))
+        if not ids:
+            return []
+        
+        try:
+            async with get_async_connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await cursor.execute(
+                        """
+                        SELECT id, status::TEXT AS status, spec_key FROM offers
+                        WHERE id = ANY(%s)
+                        ORDER BY id
+                        FOR UPDATE
+                        """,
+                        (ids,),
+                    )
+                    current = {row['id']: row for row in await cursor.fetchall()}
+                    
+                    results = []
+                    allowed = []
+                    for offer_id in ids:
+                        row = current.get(offer_id)
+                        previous = row['status'] if row else None
+                        if row is None:
+                            result = "not_found"
+                        elif previous == status:
+                            result = "unchanged"
+                        elif status in OFFER_TRANSITIONS.get(previous, ()):
+                            result = "updated"
+                            allowed.append(offer_id)
+                        else:
+                            result = "invalid_transition"
+                        results.append({
+                            "id": offer_id,
+                            "result": result,
+                            "previous_status": previous,
+                        })
+                    
+                    if allowed:
+                        await cursor.execute(
+                            """
+                            UPDATE offers
+                            SET status = %s, notes = COALESCE(%s, notes),
+                                updated_at = %s
+                            WHERE id = ANY(%s)
+                            """,
+                            (status, notes, datetime.now(), allowed),
+                        )
+                    await conn.commit()
+                    
+        except psycopg.Error as e:
+            logger.error(f"Database error updating offer statuses: {e}")
+            raise OfferError(f"Failed to update offer statuses: {e}")
+        
+        for offer_id in allowed:
+            invalidate_offer(offer_id, current[offer_id]['spec_key'])
+        logger.info(f"Moved {len(allowed)} of {len(ids)} offers to {status}")
+        return results
+    
     @staticmethod
     async def delete_offer(offer_id: int) -> bool:
         """Delete an offer from the database."""
         try:
-            with get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cursor:
-                    query = "DELETE FROM offers WHERE id = %s"
-                    cursor.execute(query, (offer_id,))
-                    conn.commit()
+            async with get_async_connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    query = "DELETE FROM offers WHERE id = %s RETURNING spec_key"
+                    await cursor.execute(query, (offer_id,))
+                    deleted = await cursor.fetchone()
+                    await conn.commit()
                     
-                    return cursor.rowcount > 0
+                    if not deleted:
+                        return False
+                    invalidate_offer(offer_id, deleted['spec_key'])
+                    return True
                     
         except psycopg.Error as e:
             logger.error(f"Database error deleting offer: {e}")
@@ -180,34 +732,47 @@ class OfferManager:
     
     @staticmethod
     async def get_offers_summary(spec: str = None) -> Dict[str, Any]:
-        """Get summary statistics for offers."""
+        """Get summary statistics for offers.
+        
+        Served from ``offer_spec_summary``, which triggers keep up to date on
+        every insert, status/price change and delete (migrations/009), so the
+        cost does not grow with the offers table. Without ``spec`` the
+        per-spec rows, histograms included, are added up in SQL. Includes
+        p10/p50/p90 price estimates.
+        """
         try:
-            with get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cursor:
-                    base_query = """
-                        SELECT 
-                            COUNT(*) as total_offers,
-                            COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_offers,
-                            COUNT(CASE WHEN status = 'accepted' THEN 1 END) as accepted_offers,
-                            COUNT(CASE WHEN status = 'rejected' THEN 1 END) as rejected_offers,
-                            AVG(price) as avg_price,
-                            MIN(price) as min_price,
-                            MAX(price) as max_price
-                        FROM offers
-                    """
-                    
+            async with get_async_connection(readonly=True) as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
                     if spec:
-                        query = base_query + " WHERE product_spec = %s"
-                        cursor.execute(query, (spec,))
+                        # Summary rows are keyed by spec_key (migrations/010)
+                        query = SUMMARY_SQL.format(where="WHERE product_spec = %s")
+                        await cursor.execute(query, (canonical_spec(spec),))
                     else:
-                        cursor.execute(base_query)
+                        await cursor.execute(SUMMARY_SQL.format(where=""))
                     
-                    result = cursor.fetchone()
-                    return dict(result) if result else {}
+                    row = await cursor.fetchone()
                     
         except psycopg.Error as e:
             logger.error(f"Database error getting offers summary: {e}")
             raise OfferError(f"Failed to get offers summary: {e}")
+        
+        return OfferManager._summarize(row)
+    
+    @staticmethod
+    def _summarize(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the average and percentile estimates to a SUMMARY_SQL row."""
+        counts = ("total_offers", "pending_offers", "accepted_offers", "rejected_offers")
+        summary: Dict[str, Any] = {key: row[key] for key in counts}
+        priced = row["priced_offers"]
+        summary["avg_price"] = row["price_sum"] / priced if priced else None
+        summary["min_price"] = row["min_price"]
+        summary["max_price"] = row["max_price"]
+        histogram = row["price_histogram"] or []
+        for key, q in SUMMARY_PERCENTILES.items():
+            summary[key] = histogram_percentile(
+                histogram, q, summary["min_price"], summary["max_price"]
+            )
+        return summary
     
     @staticmethod
     async def search_offers(
@@ -215,47 +780,138 @@ class OfferManager:
         status: str = None,
         min_price: float = None,
         max_price: float = None,
-        limit: int = 50
+        limit: int = 50,
+        after: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Search offers with various filters."""
+        """Search offers with various filters.
+        
+        With ``search_term`` the spec, supplier name and description are
+        matched by substring or fuzzily by word similarity (both served by
+        trigram indexes), and results are ranked best match first, exposing
+        the score as ``match_score``. Without it results are newest first.
+        ``after`` takes a :func:`next_cursor` token, as in
+        :meth:`get_offers_by_spec`. ``min_price`` and ``max_price`` are in
+        USD and compare against ``price_usd``.
+        """
+        keyset = decode_cursor(after) if after else None
+        ranked = bool(search_term)
+        if keyset and len(keyset) != (3 if ranked else 2):
+            raise InvalidCursorError("Invalid page cursor: not from this search")
         try:
-            with get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cursor:
+            async with get_async_connection(readonly=True) as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
                     conditions = []
                     params = []
+                    filters = []
                     
                     base_query = "SELECT * FROM offers WHERE 1=1"
                     
-                    if search_term:
-                        conditions.append("(product_spec ILIKE %s OR supplier_name ILIKE %s OR product_description ILIKE %s)")
+                    if ranked:
+                        base_query = (
+                            f"SELECT *, {MATCH_SCORE_SQL} AS match_score "
+                            "FROM offers WHERE 1=1"
+                        )
+                        params.extend([search_term] * 3)
+                        conditions.append(TEXT_MATCH_SQL)
                         search_pattern = f"%{search_term}%"
-                        params.extend([search_pattern, search_pattern, search_pattern])
+                        params.extend([search_pattern] * 3 + [search_term] * 3)
+                        filters.append("term")
                     
                     if status:
                         conditions.append("status = %s")
                         params.append(status)
+                        filters.append("status")
                     
+                    # Price bounds are in USD so offers in any currency compare
                     if min_price is not None:
-                        conditions.append("price >= %s")
+                        conditions.append("price_usd >= %s")
                         params.append(min_price)
+                        filters.append("min_price")
                     
                     if max_price is not None:
-                        conditions.append("price <= %s")
+                        conditions.append("price_usd <= %s")
                         params.append(max_price)
+                        filters.append("max_price")
+                    
+                    if keyset and ranked:
+                        conditions.append(
+                            f"({MATCH_SCORE_SQL}, created_at, id) < (%s, %s, %s)"
+                        )
+                        params.extend([search_term] * 3 + list(keyset))
+                        filters.append("after")
+                    elif keyset:
+                        # Plain bound for partition pruning, as in by_spec_after
+                        conditions.append(
+                            "created_at <= %s AND (created_at, id) < (%s, %s)"
+                        )
+                        params.extend([keyset[0], *keyset])
+                        filters.append("after")
                     
                     if conditions:
                         query = base_query + " AND " + " AND ".join(conditions)
                     else:
                         query = base_query
                     
-                    query += " ORDER BY created_at DESC LIMIT %s"
+                    if ranked:
+                        query += " ORDER BY match_score DESC, created_at DESC, id DESC"
+                    else:
+                        query += " ORDER BY created_at DESC, id DESC"
+                    query += " LIMIT %s"
                     params.append(limit)
                     
-                    cursor.execute(query, params)
-                    offers = cursor.fetchall()
+                    # Each filter combination is its own prepared statement
+                    name = "offers.search:" + ",".join(filters)
+                    statements.register(name, query)
+                    await statements.execute(cursor, name, params)
+                    offers = await cursor.fetchall()
                     
                     return [dict(offer) for offer in offers]
                     
         except psycopg.Error as e:
             logger.error(f"Database error searching offers: {e}")
             raise OfferError(f"Failed to search offers: {e}")
+
+
+async def ensure_offer_partitions(
+    months_ahead: int = OFFER_PARTITION_MONTHS_AHEAD
+) -> List[str]:
+    """Create missing monthly offers partitions up to ``months_ahead`` out.
+    
+    Returns the names of the partitions created (usually none).
+    """
+    async with get_async_connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cursor:
+            await cursor.execute(
+                "SELECT ensure_offer_partitions(%s) AS name", (months_ahead,)
+            )
+            created = [row['name'] for row in await cursor.fetchall()]
+            await conn.commit()
+    if created:
+        logger.info(f"Created offer partitions: {', '.join(created)}")
+    return created
+
+
+async def store_offer(offer_data: Dict[str, Any], supplier_info: Dict[str, str], spec: str) -> Optional[int]:
+    """Convenience wrapper around :meth:`OfferManager.store_offer`."""
+    return await OfferManager.store_offer(offer_data, supplier_info, spec)
+
+
+async def store_offers(
+    batch: Sequence[Tuple[Dict[str, Any], Dict[str, str], str]]
+) -> Dict[str, Any]:
+    """Convenience wrapper around :meth:`OfferManager.store_offers`."""
+    return await OfferManager.store_offers(batch)
+
+
+async def get_offers(spec: str, limit: int = 3) -> List[Dict[str, Any]]:
+    """Convenience wrapper around :meth:`OfferManager.get_cheapest_offers`."""
+    return await OfferManager.get_cheapest_offers(spec, limit=limit)
+
+
+async def get_ranked_offers(
+    spec: str, limit: int = 3, quantity: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """Convenience wrapper around :meth:`OfferManager.get_landed_cost_offers`."""
+    return await OfferManager.get_landed_cost_offers(
+        spec, limit=limit, quantity=quantity
+    )
@@ -0,0 +1,132 @@
+"""Registry of named, server-side prepared statements.
+
+Hot queries are registered once under a name and executed with psycopg's
+``prepare=True``: the first execution on a connection parses and plans the
+statement server-side, and every later execution on that (pooled)
+connection reuses the plan. The registry records timings for both kinds of
+execution so the saving is visible, and :meth:`StatementRegistry.explain`
+reports Postgres' own planning versus execution time for a statement.
+"""
+
+import json
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Set
+
+
+def _average_ms(seconds: float, calls: int) -> Optional[float]:
+    return 1000 * seconds / calls if calls else None
+
+
+@dataclass
+class StatementStats:
+    """Execution counters for one registered statement."""
+
+    sql: str
+    cold_calls: int = 0
+    cold_seconds: float = 0.0
+    warm_calls: int = 0
+    warm_seconds: float = 0.0
+    last_explain: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "cold_calls": self.cold_calls,
+            "warm_calls": self.warm_calls,
+            "avg_cold_ms": _average_ms(self.cold_seconds, self.cold_calls),
+            "avg_warm_ms": _average_ms(self.warm_seconds, self.warm_calls),
+            "explain": dict(self.last_explain),
+        }
+
+
+class StatementRegistry:
+    """Named statements executed as server-side prepared statements."""
+
+    def __init__(self):
+        self._statements: Dict[str, StatementStats] = {}
+        self._prepared: "weakref.WeakKeyDictionary[Any, Set[str]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str) -> None:
+        """Register ``sql`` under ``name``; re-registering the same SQL is a no-op."""
+        with self._lock:
+            existing = self._statements.get(name)
+            if existing is not None and existing.sql != sql:
+                raise ValueError(f"Statement {name!r} is already registered")
+            if existing is None:
+                self._statements[name] = StatementStats(sql)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def sql(self, name: str) -> str:
+        """SQL registered under ``name``."""
+        return self._statements[name].sql
+
+    async def execute(
+        self, cursor, name: str, params: Optional[Sequence[Any]] = None
+    ):
+        """Execute statement ``name`` on ``cursor`` as a prepared statement.
+
+        Cold calls are the first execution of ``name`` on a connection and
+        include parsing and planning; warm calls reuse the prepared plan.
+        """
+        stats = self._statements[name]
+        connection = cursor.connection
+        prepared = self._prepared.setdefault(connection, set())
+        cold = name not in prepared
+
+        start = time.perf_counter()
+        await cursor.execute(stats.sql, params, prepare=True)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            if cold:
+                prepared.add(name)
+                stats.cold_calls += 1
+                stats.cold_seconds += elapsed
+            else:
+                stats.warm_calls += 1
+                stats.warm_seconds += elapsed
+        return cursor
+
+    async def explain(
+        self, cursor, name: str, params: Optional[Sequence[Any]] = None
+    ) -> Dict[str, float]:
+        """Run ``EXPLAIN ANALYZE`` on a statement; returns planning/execution ms."""
+        stats = self._statements[name]
+        await cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {stats.sql}", params)
+        row = await cursor.fetchone()
+        plan = row["QUERY PLAN"] if isinstance(row, dict) else row[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        timings = {
+            "planning_ms": plan[0]["Planning Time"],
+            "execution_ms": plan[0]["Execution Time"],
+        }
+        stats.last_explain = timings
+        return timings
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-statement timings."""
+        with self._lock:
+            return {name: s.as_dict() for name, s in self._statements.items()}
+
+    def reset_stats(self) -> None:
+        """Zero all counters (registered statements are kept)."""
+        with self._lock:
+            for name, s in self._statements.items():
+                self._statements[name] = StatementStats(s.sql)
+
+
+# Process-wide registry used by the data-access modules
+statements = StatementRegistry()
+
+
+def statement_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-statement cold/warm timings of the shared registry."""
+    return statements.stats()
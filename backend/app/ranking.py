@@ -0,0 +1,138 @@
+"""Landed-cost ranking of supplier offers.
+
+Raw price is a poor way to pick the best quote: offers come in different
+currencies, a long lead time ties up working capital, and a minimum order
+above the quantity needed means paying for units nobody wants. Offers are
+scored by landed cost per needed unit in USD::
+
+    price_usd * max(minimum_order, quantity) / quantity
+              * (1 + lead_time_cost_per_day * lead_time_days)
+
+``price_usd`` is the price converted when the offer was stored, the same
+value cheapest-offer lookups and price filters use; offers stored without
+one are converted as ``price * usd_rate`` at the current rates.
+
+Candidates are held column-wise in NumPy arrays, so a spec with 100k offers
+is scored in one vectorized pass, and the top k are picked with
+``np.argpartition`` (linear time) rather than a full sort. Offers without a
+price or in an unknown currency score ``inf`` and are never returned.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .fx import usd_rate
+
+RANKING_LEAD_TIME_COST = float(os.getenv("RANKING_LEAD_TIME_COST", "0.002"))
+RANKING_DEFAULT_LEAD_TIME = float(os.getenv("RANKING_DEFAULT_LEAD_TIME", "30"))
+
+
+@dataclass(frozen=True)
+class LandedCostConfig:
+    """Weights of the landed-cost score.
+
+    ``quantity`` is the number of units needed; without it minimum orders
+    are not penalized. Offers with no lead time are assumed to take
+    ``default_lead_time_days``. ``rates`` (USD per unit, by ISO code)
+    converts offers without a stored ``price_usd`` and defaults to the
+    :mod:`backend.app.fx` table.
+    """
+
+    quantity: Optional[float] = None
+    lead_time_cost_per_day: float = RANKING_LEAD_TIME_COST
+    default_lead_time_days: float = RANKING_DEFAULT_LEAD_TIME
+    rates: Optional[Mapping[str, float]] = None
+
+
+@dataclass
+class OfferArrays:
+    """Candidate offers as parallel columns; missing numbers are NaN."""
+
+    ids: np.ndarray
+    price: np.ndarray
+    currency: np.ndarray
+    lead_time: np.ndarray
+    minimum_order: np.ndarray
+    price_usd: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]]) -> "OfferArrays":
+        """Build from rows of the ``offers.ranking_candidates`` statement.
+
+        Rows are ``(id, price, currency, lead_time, minimum_order,
+        price_usd)``. Numeric columns may hold None; currency must be a
+        string ("" = USD).
+        """
+        if not rows:
+            empty = np.empty(0)
+            return cls(
+                empty.astype(np.int64), empty, empty.astype(str), empty, empty, empty
+            )
+        ids, price, currency, lead_time, minimum_order, price_usd = zip(*rows)
+        return cls(
+            ids=np.array(ids, dtype=np.int64),
+            price=np.array(price, dtype=np.float64),
+            currency=np.array(currency, dtype=str),
+            lead_time=np.array(lead_time, dtype=np.float64),
+            minimum_order=np.array(minimum_order, dtype=np.float64),
+            price_usd=np.array(price_usd, dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def usd_rates(
+    currency: np.ndarray, rates: Optional[Mapping[str, float]] = None
+) -> np.ndarray:
+    """Rate per offer, looked up once per distinct currency (NaN if unknown)."""
+    if not len(currency):
+        return np.empty(0)
+    distinct, inverse = np.unique(currency, return_inverse=True)
+    table = np.array([usd_rate(code, rates) for code in distinct], dtype=np.float64)
+    return table[inverse]
+
+
+def landed_cost(arrays: OfferArrays, config: LandedCostConfig) -> np.ndarray:
+    """Landed cost per needed unit in USD; ``inf`` where it cannot be priced."""
+    unit = arrays.price_usd.copy()
+    unconverted = np.isnan(unit)
+    if unconverted.any():
+        unit[unconverted] = arrays.price[unconverted] * usd_rates(
+            arrays.currency[unconverted], config.rates
+        )
+    lead_time = np.where(
+        np.isnan(arrays.lead_time), config.default_lead_time_days, arrays.lead_time
+    )
+    cost = unit * (1.0 + config.lead_time_cost_per_day * np.maximum(lead_time, 0.0))
+    if config.quantity:
+        paid_units = np.fmax(arrays.minimum_order, config.quantity)
+        cost *= paid_units / config.quantity
+    cost[~np.isfinite(cost) | (cost < 0)] = np.inf
+    return cost
+
+
+def top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` lowest finite scores, best first (ties by id)."""
+    if k <= 0 or not len(scores):
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.isfinite(scores[candidates])]
+    return candidates[np.lexsort((ids[candidates], scores[candidates]))]
+
+
+def rank_offers(
+    arrays: OfferArrays, k: int = 3, config: Optional[LandedCostConfig] = None
+) -> List[Dict[str, Any]]:
+    """The ``k`` best offers as ``{"id", "landed_cost"}``, cheapest first."""
+    scores = landed_cost(arrays, config or LandedCostConfig())
+    return [
+        {"id": int(arrays.ids[i]), "landed_cost": float(scores[i])}
+        for i in top_k(scores, arrays.ids, k)
+    ]
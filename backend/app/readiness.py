@@ -0,0 +1,99 @@
+"""Readiness checks for the API's dependencies.
+
+``/ready`` asks whether the pooled database, the SMTP relay and the IMAP
+server are reachable. The three checks run concurrently, each bounded by
+``READINESS_CHECK_TIMEOUT``, and the combined result is cached for
+``READINESS_CACHE_TTL`` seconds; concurrent probes that miss the cache
+share a single round of checks.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from .cache import TTLCache
+from .db import get_async_connection
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
+IMAP_HOST = os.getenv("IMAP_HOST", "localhost")
+IMAP_PORT = int(os.getenv("IMAP_PORT", "1143"))
+READINESS_CHECK_TIMEOUT = float(os.getenv("READINESS_CHECK_TIMEOUT", "2"))
+READINESS_CACHE_TTL = float(os.getenv("READINESS_CACHE_TTL", "5"))
+
+_TLS_PORTS = {465, 993}
+
+_results = TTLCache(max_items=1, ttl=READINESS_CACHE_TTL)
+_lock = asyncio.Lock()
+
+
+async def check_database() -> None:
+    """Run ``SELECT 1`` on a pooled connection."""
+    async with get_async_connection() as conn:
+        await conn.execute("SELECT 1")
+
+
+async def _check_greeting(host: str, port: int, greeting: bytes) -> None:
+    """Connect and expect the server greeting to start with ``greeting``."""
+    reader, writer = await asyncio.open_connection(
+        host, port, ssl=port in _TLS_PORTS
+    )
+    try:
+        line = await reader.readline()
+        if not line.startswith(greeting):
+            raise ConnectionError(f"unexpected greeting {line[:40]!r}")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def check_smtp() -> None:
+    await _check_greeting(SMTP_HOST, SMTP_PORT, b"220")
+
+
+async def check_imap() -> None:
+    await _check_greeting(IMAP_HOST, IMAP_PORT, b"* OK")
+
+
+CHECKS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "database": check_database,
+    "smtp": check_smtp,
+    "imap": check_imap,
+}
+
+
+async def _run(name: str, check: Callable[[], Awaitable[None]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(check(), timeout=READINESS_CHECK_TIMEOUT)
+        result = {"ok": True}
+    except Exception as e:
+        logger.warning(f"Readiness check {name} failed: {e!r}")
+        result = {"ok": False, "error": type(e).__name__}
+    result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+async def readiness() -> Dict[str, Any]:
+    """Return ``{"ready": bool, "checks": {...}, "checked_at": ...}``, cached."""
+    cached = _results.get("ready")
+    if cached is not None:
+        return cached
+    async with _lock:
+        cached = _results.get("ready")
+        if cached is not None:
+            return cached
+        names = list(CHECKS)
+        results = await asyncio.gather(*(_run(name, CHECKS[name]) for name in names))
+        checks = dict(zip(names, results))
+        report = {
+            "ready": all(result["ok"] for result in checks.values()),
+            "checks": checks,
+            "checked_at": time.time(),
+        }
+        _results.set("ready", report)
+        return report
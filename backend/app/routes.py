@@ -1,19 +1,30 @@
+from typing import Optional
+
 from fastapi import APIRouter, Query
-from backend.app.offers import get_offers
+from backend.app.offers import get_ranked_offers
 
 quotes_router = APIRouter()
 
 
 @quotes_router.get("/quotes")
-async def get_quotes(spec: str = Query(..., description="Product specification to search for")):
+async def get_quotes(
+    spec: str = Query(..., description="Product specification to search for"),
+    quantity: Optional[int] = Query(
+        None, ge=1, description="Units needed; minimum orders above it cost extra"
+    ),
+    limit: int = Query(3, ge=1, le=50),
+):
     """
-    Get the 3 cheapest offers for a given specification.
+    Get the best offers for a given specification by landed cost.
     
     Args:
         spec: Product specification to search for
+        quantity: Units needed, used to price in minimum order quantities
+        limit: Number of offers to return (default 3)
         
     Returns:
-        JSON list of offers sorted by price ascending
+        JSON list of offers sorted by ``landed_cost`` (USD per needed unit,
+        including currency conversion and lead time) ascending
     """
-    offers = get_offers(spec, limit=3)
-    return offers 
\ No newline at end of file
+    offers = await get_ranked_offers(spec, limit=limit, quantity=quantity)
+    return offers
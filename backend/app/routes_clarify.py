@@ -209,7 +209,7 @@ async def get_rfq_session(session_id: str):
         Session details including conversation history
     """
     try:
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT session_id, original_spec, spec_json, status, messages, created_at, updated_at
@@ -253,7 +253,7 @@ async def list_rfq_sessions(limit: int = 50, status: Optional[str] = None):
         List of RFQ sessions
     """
     try:
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             
             query = """
@@ -4,7 +4,6 @@ import json
 from typing import List, Dict, Any
 import httpx
 import anyio
-from bs4 import BeautifulSoup
 import re
 
 SERP_KEY = os.getenv("SERPAPI_KEY")
@@ -77,6 +76,8 @@ async def _fallback_search(query: str, k: int) -> List[Dict[str, Any]]:
         if response.status_code != 200:
             raise SupplierSearchError(f"Google search returned {response.status_code}")
         
+        from bs4 import BeautifulSoup  # deferred: only the fallback path parses HTML
+
         soup = BeautifulSoup(response.text, 'html.parser')
         suppliers = []
         
@@ -0,0 +1,72 @@
+-- Compact embedding storage: a half-precision or binary-quantized copy of
+-- documents.embedding. The compact column is indexed and searched first;
+-- the full-precision column is kept for exact re-ranking of the candidates.
+--
+-- Only the mode chosen for the deployment is built. `make db-migrate` passes
+-- EMBEDDING_STORAGE=full|halfvec|binary in as app.embedding_storage (unset
+-- means full). A compact mode drops the full-precision ivfflat index, which
+-- re-ranking never uses; rerunning with another mode drops the columns and
+-- indexes of the previous one and rebuilds what the new one needs.
+
+-- Keep the compact column of the mode passed as trigger argument in sync
+CREATE OR REPLACE FUNCTION quantize_document_embedding()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_ARGV[0] = 'halfvec' THEN
+        NEW.embedding_half = NEW.embedding::halfvec(384);
+    ELSE
+        NEW.embedding_bit = binary_quantize(NEW.embedding)::bit(384);
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DO $$
+DECLARE
+    mode TEXT := COALESCE(NULLIF(current_setting('app.embedding_storage', true), ''), 'full');
+BEGIN
+    IF mode NOT IN ('full', 'halfvec', 'binary') THEN
+        RAISE EXCEPTION 'Unknown EMBEDDING_STORAGE: %', mode;
+    END IF;
+
+    DROP TRIGGER IF EXISTS quantize_document_embedding ON documents;
+    IF mode <> 'halfvec' THEN
+        DROP INDEX IF EXISTS documents_embedding_half_idx;
+        ALTER TABLE documents DROP COLUMN IF EXISTS embedding_half;
+    END IF;
+    IF mode <> 'binary' THEN
+        DROP INDEX IF EXISTS documents_embedding_bit_idx;
+        ALTER TABLE documents DROP COLUMN IF EXISTS embedding_bit;
+    END IF;
+
+    IF mode = 'full' THEN
+        CREATE INDEX IF NOT EXISTS documents_embedding_idx
+        ON documents USING ivfflat (embedding vector_cosine_ops);
+        RETURN;
+    END IF;
+
+    IF mode = 'halfvec' THEN
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS embedding_half halfvec(384);
+        UPDATE documents SET embedding_half = embedding::halfvec(384)
+        WHERE embedding_half IS NULL;
+        CREATE INDEX IF NOT EXISTS documents_embedding_half_idx
+        ON documents USING ivfflat (embedding_half halfvec_cosine_ops);
+    ELSE
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS embedding_bit bit(384);
+        UPDATE documents SET embedding_bit = binary_quantize(embedding)::bit(384)
+        WHERE embedding_bit IS NULL;
+        CREATE INDEX IF NOT EXISTS documents_embedding_bit_idx
+        ON documents USING ivfflat (embedding_bit bit_hamming_ops);
+    END IF;
+
+    EXECUTE format(
+        'CREATE TRIGGER quantize_document_embedding '
+        'BEFORE INSERT OR UPDATE OF embedding ON documents '
+        'FOR EACH ROW EXECUTE FUNCTION quantize_document_embedding(%L)',
+        mode
+    );
+
+    -- Re-ranking reads the candidates' full-precision rows, never this index
+    DROP INDEX IF EXISTS documents_embedding_idx;
+END;
+$$;
@@ -0,0 +1,9 @@
+-- Full-text search over documents for hybrid (lexical + vector) retrieval.
+-- The 'simple' configuration skips stemming and stop words, so supplier
+-- part numbers and SKUs are indexed as exact tokens.
+ALTER TABLE documents
+  ADD COLUMN IF NOT EXISTS content_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED;
+
+CREATE INDEX IF NOT EXISTS documents_content_tsv_idx
+ON documents USING gin (content_tsv);
@@ -0,0 +1,8 @@
+-- Composite indexes for keyset pagination of offer listings. Pages are
+-- fetched with (created_at, id) < (cursor) ORDER BY created_at DESC, id DESC,
+-- which these indexes serve without an OFFSET scan or a sort.
+CREATE INDEX IF NOT EXISTS idx_offers_created_id
+ON offers (created_at DESC, id DESC);
+
+-- Per-spec listings are served by idx_offers_spec_key_created_id on the
+-- canonical key (migrations/010)
@@ -0,0 +1,14 @@
+-- Trigram indexes for offer search. gin_trgm_ops serves both the
+-- ILIKE '%term%' substring matches and the fuzzy word-similarity operator
+-- (term <% column) used by OfferManager.search_offers, so neither needs a
+-- sequential scan of offers.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_offers_product_spec_trgm
+ON offers USING gin (product_spec gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_offers_supplier_name_trgm
+ON offers USING gin (supplier_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_offers_product_description_trgm
+ON offers USING gin (product_description gin_trgm_ops);
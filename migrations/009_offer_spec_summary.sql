@@ -0,0 +1,187 @@
+-- Per-spec offer statistics maintained incrementally by triggers, so
+-- OfferManager.get_offers_summary reads one row per spec instead of
+-- aggregating the whole offers table.
+--
+-- Prices are also counted in a log-scale histogram: 20 buckets per decade
+-- from 0.01 upwards (160 buckets, ~12% wide), from which p10/p50/p90 are
+-- estimated. Keep the constants in sync with backend/app/offers.py.
+CREATE TABLE IF NOT EXISTS offer_spec_summary (
+    product_spec TEXT PRIMARY KEY,
+    total_offers BIGINT NOT NULL DEFAULT 0,
+    pending_offers BIGINT NOT NULL DEFAULT 0,
+    accepted_offers BIGINT NOT NULL DEFAULT 0,
+    rejected_offers BIGINT NOT NULL DEFAULT 0,
+    priced_offers BIGINT NOT NULL DEFAULT 0,
+    price_sum NUMERIC NOT NULL DEFAULT 0,
+    min_price NUMERIC,
+    max_price NUMERIC,
+    price_histogram BIGINT[] NOT NULL DEFAULT array_fill(0::BIGINT, ARRAY[160]),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 0-based histogram bucket of a price; the outermost buckets are open-ended
+CREATE OR REPLACE FUNCTION offer_price_bucket(price NUMERIC)
+RETURNS INTEGER AS $$
+    SELECT CASE
+        WHEN price <= 0.01 THEN 0
+        ELSE LEAST(159, floor(20 * log(price / 0.01))::INTEGER)
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Add (sign = 1) or remove (sign = -1) one offer from its spec's summary
+CREATE OR REPLACE FUNCTION offer_summary_apply(
+    spec TEXT, offer_status TEXT, offer_price NUMERIC, sign INTEGER
+) RETURNS VOID AS $$
+DECLARE
+    bucket INTEGER := offer_price_bucket(offer_price) + 1;  -- arrays are 1-based
+    priced INTEGER := CASE WHEN offer_price IS NULL THEN 0 ELSE sign END;
+    summary offer_spec_summary%ROWTYPE;
+BEGIN
+    spec := COALESCE(spec, '');
+    INSERT INTO offer_spec_summary (product_spec) VALUES (spec)
+    ON CONFLICT (product_spec) DO NOTHING;
+
+    UPDATE offer_spec_summary s SET
+        total_offers = s.total_offers + sign,
+        pending_offers = s.pending_offers
+            + CASE WHEN offer_status = 'pending' THEN sign ELSE 0 END,
+        accepted_offers = s.accepted_offers
+            + CASE WHEN offer_status = 'accepted' THEN sign ELSE 0 END,
+        rejected_offers = s.rejected_offers
+            + CASE WHEN offer_status = 'rejected' THEN sign ELSE 0 END,
+        priced_offers = s.priced_offers + priced,
+        price_sum = s.price_sum + COALESCE(offer_price, 0) * sign,
+        min_price = CASE WHEN sign > 0 AND offer_price IS NOT NULL
+            THEN LEAST(s.min_price, offer_price) ELSE s.min_price END,
+        max_price = CASE WHEN sign > 0 AND offer_price IS NOT NULL
+            THEN GREATEST(s.max_price, offer_price) ELSE s.max_price END,
+        price_histogram = CASE WHEN offer_price IS NULL THEN s.price_histogram
+            ELSE s.price_histogram[1:bucket - 1]
+                 || (s.price_histogram[bucket] + sign)
+                 || s.price_histogram[bucket + 1:160] END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE s.product_spec = spec
+    RETURNING * INTO summary;
+
+    IF summary.total_offers <= 0 THEN
+        DELETE FROM offer_spec_summary WHERE product_spec = spec;
+    ELSIF sign < 0 AND offer_price IS NOT NULL
+          AND (offer_price <= summary.min_price OR offer_price >= summary.max_price) THEN
+        -- Removing an extreme is not invertible; rescan this spec only
+        UPDATE offer_spec_summary SET (min_price, max_price) = (
+            SELECT MIN(price), MAX(price) FROM offers o
+            WHERE COALESCE(o.product_spec, '') = spec
+        )
+        WHERE product_spec = spec;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_offer_spec_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.product_spec IS NOT DISTINCT FROM OLD.product_spec
+       AND NEW.status::TEXT IS NOT DISTINCT FROM OLD.status::TEXT
+       AND NEW.price IS NOT DISTINCT FROM OLD.price THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE'
+       AND NEW.product_spec IS NOT DISTINCT FROM OLD.product_spec
+       AND NEW.price IS NOT DISTINCT FROM OLD.price THEN
+        -- Only the status changed: move one count. Prices, min/max and the
+        -- histogram stay as they are, so there is nothing to rescan.
+        UPDATE offer_spec_summary SET
+            pending_offers = pending_offers
+                + (NEW.status::TEXT IS NOT DISTINCT FROM 'pending')::INTEGER
+                - (OLD.status::TEXT IS NOT DISTINCT FROM 'pending')::INTEGER,
+            accepted_offers = accepted_offers
+                + (NEW.status::TEXT IS NOT DISTINCT FROM 'accepted')::INTEGER
+                - (OLD.status::TEXT IS NOT DISTINCT FROM 'accepted')::INTEGER,
+            rejected_offers = rejected_offers
+                + (NEW.status::TEXT IS NOT DISTINCT FROM 'rejected')::INTEGER
+                - (OLD.status::TEXT IS NOT DISTINCT FROM 'rejected')::INTEGER,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE product_spec = COALESCE(NEW.product_spec, '');
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM offer_summary_apply(OLD.product_spec, OLD.status::TEXT, OLD.price, -1);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM offer_summary_apply(NEW.product_spec, NEW.status::TEXT, NEW.price, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maintain_offer_spec_summary ON offers;
+CREATE TRIGGER maintain_offer_spec_summary
+    AFTER INSERT OR UPDATE OR DELETE ON offers
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_offer_spec_summary();
+
+-- Rebuild every summary row from offers in one set-based pass
+CREATE OR REPLACE FUNCTION offer_summary_rebuild()
+RETURNS VOID AS $$
+    TRUNCATE offer_spec_summary;
+    WITH keyed AS (
+        SELECT COALESCE(product_spec, '') AS spec, status::TEXT AS status, price
+        FROM offers
+    ),
+    -- log() on NUMERIC is slow, so each distinct price is bucketed once
+    price_buckets AS MATERIALIZED (
+        SELECT price, offer_price_bucket(price) + 1 AS bucket
+        FROM (SELECT DISTINCT price FROM keyed WHERE price IS NOT NULL) prices
+    ),
+    buckets AS (
+        SELECT k.spec, p.bucket, COUNT(*) AS n
+        FROM keyed k
+        JOIN price_buckets p ON p.price = k.price
+        GROUP BY 1, 2
+    ),
+    histograms AS (
+        SELECT s.spec, array_agg(COALESCE(b.n, 0) ORDER BY g.bucket) AS histogram
+        FROM (SELECT DISTINCT spec FROM buckets) s
+        CROSS JOIN generate_series(1, 160) AS g(bucket)
+        LEFT JOIN buckets b ON b.spec = s.spec AND b.bucket = g.bucket
+        GROUP BY s.spec
+    ),
+    totals AS (
+        SELECT spec,
+               COUNT(*) AS total_offers,
+               COUNT(*) FILTER (WHERE status = 'pending') AS pending_offers,
+               COUNT(*) FILTER (WHERE status = 'accepted') AS accepted_offers,
+               COUNT(*) FILTER (WHERE status = 'rejected') AS rejected_offers,
+               COUNT(price) AS priced_offers,
+               COALESCE(SUM(price), 0) AS price_sum,
+               MIN(price) AS min_price,
+               MAX(price) AS max_price
+        FROM keyed
+        GROUP BY spec
+    )
+    INSERT INTO offer_spec_summary (
+        product_spec, total_offers, pending_offers, accepted_offers,
+        rejected_offers, priced_offers, price_sum, min_price, max_price,
+        price_histogram
+    )
+    SELECT t.spec, t.total_offers, t.pending_offers, t.accepted_offers,
+           t.rejected_offers, t.priced_offers, t.price_sum, t.min_price,
+           t.max_price, COALESCE(h.histogram, array_fill(0::BIGINT, ARRAY[160]))
+    FROM totals t
+    LEFT JOIN histograms h ON h.spec = t.spec;
+$$ LANGUAGE sql;
+
+-- Backfill on first install only: afterwards the trigger keeps the summary
+-- current, and once migrations/010 has added spec_key it regroups instead
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM offer_spec_summary)
+       AND NOT EXISTS (
+           SELECT 1 FROM information_schema.columns
+           WHERE table_name = 'offers' AND column_name = 'spec_key'
+       ) THEN
+        PERFORM offer_summary_rebuild();
+    END IF;
+END;
+$$;
@@ -0,0 +1,194 @@
+-- Canonical spec keys. offers.spec_key holds canonical_spec(product_spec)
+-- from backend/app/offers.py (NFKC, case-folded, whitespace collapsed), set
+-- by store_offer/store_offers. Spec listings filter on the key and page
+-- newest first, so the B-tree on (spec_key, created_at DESC, id DESC) hands
+-- back each keyset page in order without sorting the spec's rows. It
+-- replaces the (product_spec, ...) index of migrations/007, which keyed
+-- lookups no longer use.
+--
+-- Existing rows are keyed by tools/backfill_spec_keys.py, which applies the
+-- same Python normalizer in batches; until it has run they are only found by
+-- search_offers.
+ALTER TABLE offers ADD COLUMN IF NOT EXISTS spec_key TEXT;
+
+DROP INDEX IF EXISTS idx_offers_spec_key;  -- hash index of earlier versions
+DROP INDEX IF EXISTS idx_offers_spec_created_id;
+
+CREATE INDEX IF NOT EXISTS idx_offers_spec_key_created_id
+ON offers (spec_key, created_at DESC, id DESC);
+
+-- Rows awaiting tools/backfill_spec_keys.py are still matched by raw spec in
+-- the summary rescan below; the index empties as the backfill runs
+CREATE INDEX IF NOT EXISTS idx_offers_unkeyed_spec
+ON offers (product_spec) WHERE spec_key IS NULL;
+
+-- offer_spec_summary (migrations/009) groups by the key from now on; its
+-- product_spec column holds spec_key, or the raw spec for rows not yet
+-- backfilled. Backfill updates move their counts over through the trigger.
+-- The column comment set below marks a summary that is already regrouped.
+
+CREATE OR REPLACE FUNCTION maintain_offer_spec_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND COALESCE(NEW.spec_key, NEW.product_spec)
+           IS NOT DISTINCT FROM COALESCE(OLD.spec_key, OLD.product_spec)
+       AND NEW.status::TEXT IS NOT DISTINCT FROM OLD.status::TEXT
+       AND NEW.price IS NOT DISTINCT FROM OLD.price THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE'
+       AND COALESCE(NEW.spec_key, NEW.product_spec)
+           IS NOT DISTINCT FROM COALESCE(OLD.spec_key, OLD.product_spec)
+       AND NEW.price IS NOT DISTINCT FROM OLD.price THEN
+        -- Only the status changed: move one count. Prices, min/max and the
+        -- histogram stay as they are, so there is nothing to rescan.
+        UPDATE offer_spec_summary SET
+            pending_offers = pending_offers
+                + (NEW.status::TEXT IS NOT DISTINCT FROM 'pending')::INTEGER
+                - (OLD.status::TEXT IS NOT DISTINCT FROM 'pending')::INTEGER,
+            accepted_offers = accepted_offers
+                + (NEW.status::TEXT IS NOT DISTINCT FROM 'accepted')::INTEGER
+                - (OLD.status::TEXT IS NOT DISTINCT FROM 'accepted')::INTEGER,
+            rejected_offers = rejected_offers
+                + (NEW.status::TEXT IS NOT DISTINCT FROM 'rejected')::INTEGER
+                - (OLD.status::TEXT IS NOT DISTINCT FROM 'rejected')::INTEGER,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE product_spec = COALESCE(COALESCE(NEW.spec_key, NEW.product_spec), '');
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM offer_summary_apply(
+            COALESCE(OLD.spec_key, OLD.product_spec), OLD.status::TEXT, OLD.price, -1
+        );
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM offer_summary_apply(
+            COALESCE(NEW.spec_key, NEW.product_spec), NEW.status::TEXT, NEW.price, 1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- The min/max rescan in offer_summary_apply must match rows the same way;
+-- written as an OR of indexable conditions (idx_offers_spec_key_created_id,
+-- idx_offers_unkeyed_spec)
+CREATE OR REPLACE FUNCTION offer_summary_apply(
+    spec TEXT, offer_status TEXT, offer_price NUMERIC, sign INTEGER
+) RETURNS VOID AS $$
+DECLARE
+    bucket INTEGER := offer_price_bucket(offer_price) + 1;  -- arrays are 1-based
+    priced INTEGER := CASE WHEN offer_price IS NULL THEN 0 ELSE sign END;
+    summary offer_spec_summary%ROWTYPE;
+BEGIN
+    spec := COALESCE(spec, '');
+    INSERT INTO offer_spec_summary (product_spec) VALUES (spec)
+    ON CONFLICT (product_spec) DO NOTHING;
+
+    UPDATE offer_spec_summary s SET
+        total_offers = s.total_offers + sign,
+        pending_offers = s.pending_offers
+            + CASE WHEN offer_status = 'pending' THEN sign ELSE 0 END,
+        accepted_offers = s.accepted_offers
+            + CASE WHEN offer_status = 'accepted' THEN sign ELSE 0 END,
+        rejected_offers = s.rejected_offers
+            + CASE WHEN offer_status = 'rejected' THEN sign ELSE 0 END,
+        priced_offers = s.priced_offers + priced,
+        price_sum = s.price_sum + COALESCE(offer_price, 0) * sign,
+        min_price = CASE WHEN sign > 0 AND offer_price IS NOT NULL
+            THEN LEAST(s.min_price, offer_price) ELSE s.min_price END,
+        max_price = CASE WHEN sign > 0 AND offer_price IS NOT NULL
+            THEN GREATEST(s.max_price, offer_price) ELSE s.max_price END,
+        price_histogram = CASE WHEN offer_price IS NULL THEN s.price_histogram
+            ELSE s.price_histogram[1:bucket - 1]
+                 || (s.price_histogram[bucket] + sign)
+                 || s.price_histogram[bucket + 1:160] END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE s.product_spec = spec
+    RETURNING * INTO summary;
+
+    IF summary.total_offers <= 0 THEN
+        DELETE FROM offer_spec_summary WHERE product_spec = spec;
+    ELSIF sign < 0 AND offer_price IS NOT NULL
+          AND (offer_price <= summary.min_price OR offer_price >= summary.max_price) THEN
+        -- Removing an extreme is not invertible; rescan this key only
+        UPDATE offer_spec_summary SET (min_price, max_price) = (
+            SELECT MIN(price), MAX(price) FROM offers o
+            WHERE o.spec_key = spec
+               OR (o.spec_key IS NULL AND o.product_spec = spec)
+               OR (spec = '' AND o.spec_key IS NULL AND o.product_spec IS NULL)
+        )
+        WHERE product_spec = spec;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- offer_summary_rebuild (migrations/009) groups by the key as well
+CREATE OR REPLACE FUNCTION offer_summary_rebuild()
+RETURNS VOID AS $$
+    TRUNCATE offer_spec_summary;
+    WITH keyed AS (
+        SELECT COALESCE(spec_key, product_spec, '') AS spec,
+               status::TEXT AS status, price
+        FROM offers
+    ),
+    -- log() on NUMERIC is slow, so each distinct price is bucketed once
+    price_buckets AS MATERIALIZED (
+        SELECT price, offer_price_bucket(price) + 1 AS bucket
+        FROM (SELECT DISTINCT price FROM keyed WHERE price IS NOT NULL) prices
+    ),
+    buckets AS (
+        SELECT k.spec, p.bucket, COUNT(*) AS n
+        FROM keyed k
+        JOIN price_buckets p ON p.price = k.price
+        GROUP BY 1, 2
+    ),
+    histograms AS (
+        SELECT s.spec, array_agg(COALESCE(b.n, 0) ORDER BY g.bucket) AS histogram
+        FROM (SELECT DISTINCT spec FROM buckets) s
+        CROSS JOIN generate_series(1, 160) AS g(bucket)
+        LEFT JOIN buckets b ON b.spec = s.spec AND b.bucket = g.bucket
+        GROUP BY s.spec
+    ),
+    totals AS (
+        SELECT spec,
+               COUNT(*) AS total_offers,
+               COUNT(*) FILTER (WHERE status = 'pending') AS pending_offers,
+               COUNT(*) FILTER (WHERE status = 'accepted') AS accepted_offers,
+               COUNT(*) FILTER (WHERE status = 'rejected') AS rejected_offers,
+               COUNT(price) AS priced_offers,
+               COALESCE(SUM(price), 0) AS price_sum,
+               MIN(price) AS min_price,
+               MAX(price) AS max_price
+        FROM keyed
+        GROUP BY spec
+    )
+    INSERT INTO offer_spec_summary (
+        product_spec, total_offers, pending_offers, accepted_offers,
+        rejected_offers, priced_offers, price_sum, min_price, max_price,
+        price_histogram
+    )
+    SELECT t.spec, t.total_offers, t.pending_offers, t.accepted_offers,
+           t.rejected_offers, t.priced_offers, t.price_sum, t.min_price,
+           t.max_price, COALESCE(h.histogram, array_fill(0::BIGINT, ARRAY[160]))
+    FROM totals t
+    LEFT JOIN histograms h ON h.spec = t.spec;
+$$ LANGUAGE sql;
+
+-- Regroup the summary by key, once: afterwards the trigger keeps it grouped,
+-- and the rebuild would lock the summary (stalling offer writes) and rescan
+-- every offer on each migrate. Once spec_key exists migrations/009 leaves
+-- the backfill to this step.
+DO $$
+BEGIN
+    IF (
+        SELECT col_description(attrelid, attnum) FROM pg_attribute
+        WHERE attrelid = 'offer_spec_summary'::regclass AND attname = 'product_spec'
+    ) IS DISTINCT FROM 'offers.spec_key (raw product_spec for rows without a key)' THEN
+        PERFORM offer_summary_rebuild();
+        COMMENT ON COLUMN offer_spec_summary.product_spec IS
+            'offers.spec_key (raw product_spec for rows without a key)';
+    END IF;
+END;
+$$;
@@ -0,0 +1,132 @@
+-- Monthly range partitions of offers on created_at.
+--
+-- Partitions are named offers_YYYY_MM. ensure_offer_partitions(n) creates the
+-- current month and the next n; the API calls it at startup and
+-- tools/offer_partitions.py ensure is meant for a daily cron, so inserts never
+-- land in offers_default unless both stop running for months. Old partitions
+-- are detached (and archived or dropped) by tools/offer_partitions.py retain.
+--
+-- A partitioned table's unique keys must include the partition key, so the
+-- primary key becomes (id, created_at); ids still come from the same sequence.
+
+CREATE OR REPLACE FUNCTION create_offer_partition(for_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', for_month)::DATE;
+    upper_bound DATE := (date_trunc('month', for_month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'offers_' || to_char(for_month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF offers FOR VALUES FROM (%L) TO (%L)',
+        partition_name, lower_bound, upper_bound
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create missing partitions from this month to months_ahead months out;
+-- returns the names created
+CREATE OR REPLACE FUNCTION ensure_offer_partitions(months_ahead INTEGER DEFAULT 3)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    created TEXT;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        created := create_offer_partition(
+            (date_trunc('month', CURRENT_DATE) + make_interval(months => i))::DATE
+        );
+        IF created IS NOT NULL THEN
+            RETURN NEXT created;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One-off conversion of the plain table (skipped once offers is partitioned)
+DO $$
+DECLARE
+    identity_id BOOLEAN;
+    id_sequence TEXT;
+    index_defs TEXT[];
+    index_def TEXT;
+    data_month DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'offers'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE offers IN ACCESS EXCLUSIVE MODE;
+
+    SELECT attidentity <> '' INTO identity_id FROM pg_attribute
+    WHERE attrelid = 'offers'::regclass AND attname = 'id';
+    id_sequence := pg_get_serial_sequence('offers', 'id');
+    IF id_sequence IS NOT NULL AND NOT identity_id THEN
+        -- Keep the serial sequence when the old table is dropped
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', id_sequence);
+    END IF;
+
+    -- Non-unique indexes (migrations 007, 008, 010 and any others) are
+    -- recreated as partitioned indexes; the unique primary key is replaced
+    SELECT array_agg(pg_get_indexdef(indexrelid)) INTO index_defs
+    FROM pg_index
+    WHERE indrelid = 'offers'::regclass AND NOT indisunique;
+
+    -- The partition key must be NOT NULL to be part of the primary key
+    UPDATE offers SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP)
+    WHERE created_at IS NULL;
+
+    ALTER TABLE offers RENAME TO offers_unpartitioned;
+    IF identity_id THEN
+        CREATE TABLE offers (
+            LIKE offers_unpartitioned
+            INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY
+            INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS
+        ) PARTITION BY RANGE (created_at);
+    ELSE
+        CREATE TABLE offers (
+            LIKE offers_unpartitioned
+            INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+            INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS
+        ) PARTITION BY RANGE (created_at);
+    END IF;
+    ALTER TABLE offers ALTER COLUMN created_at SET NOT NULL;
+    ALTER TABLE offers ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;
+
+    -- Catches rows outside every monthly partition instead of failing inserts
+    CREATE TABLE offers_default PARTITION OF offers DEFAULT;
+    FOR data_month IN
+        SELECT DISTINCT date_trunc('month', created_at)::DATE FROM offers_unpartitioned
+    LOOP
+        PERFORM create_offer_partition(data_month);
+    END LOOP;
+    PERFORM ensure_offer_partitions(3);
+
+    -- No trigger on the new table yet: offer_spec_summary already counts
+    -- these rows
+    INSERT INTO offers SELECT * FROM offers_unpartitioned;
+    DROP TABLE offers_unpartitioned;
+
+    -- Index and constraint names are free again now
+    ALTER TABLE offers ADD PRIMARY KEY (id, created_at);
+
+    IF identity_id THEN
+        PERFORM setval(pg_get_serial_sequence('offers', 'id'), MAX(id)) FROM offers;
+    ELSIF id_sequence IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY offers.id', id_sequence);
+    END IF;
+
+    FOREACH index_def IN ARRAY COALESCE(index_defs, '{}') LOOP
+        EXECUTE index_def;
+    END LOOP;
+
+    CREATE TRIGGER maintain_offer_spec_summary
+        AFTER INSERT OR UPDATE OR DELETE ON offers
+        FOR EACH ROW
+        EXECUTE FUNCTION maintain_offer_spec_summary();
+END;
+$$;
+
+SELECT ensure_offer_partitions(3);
@@ -0,0 +1,11 @@
+-- Offer prices normalized to USD with the local rate table of
+-- backend/app/fx.py, so prices in different currencies can be filtered and
+-- sorted in SQL. The rates live outside the database, so this is a plain
+-- column set by store_offer/store_offers rather than a generated column; it
+-- keeps the rate in force when the quote arrived.
+--
+-- Existing rows are converted by tools/backfill_price_usd.py.
+ALTER TABLE offers ADD COLUMN IF NOT EXISTS price_usd NUMERIC;
+
+CREATE INDEX IF NOT EXISTS idx_offers_price_usd
+ON offers (price_usd);
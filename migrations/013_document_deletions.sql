@@ -0,0 +1,29 @@
+-- Change feed for the in-process ANN mirror (backend/app/ann_index.py).
+-- IVFIndex.sync reads new documents in (created_at, id) order and deleted
+-- ids from document_deletions, each from a watermark minus ANN_SYNC_OVERLAP.
+-- TRUNCATE does not fire the trigger; delete the mirror's directory after
+-- truncating documents. Old log rows can be deleted once every mirror has
+-- synced past them.
+CREATE INDEX IF NOT EXISTS documents_created_at_idx ON documents (created_at, id);
+
+CREATE TABLE IF NOT EXISTS document_deletions (
+    id INTEGER NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS document_deletions_deleted_at_idx
+ON document_deletions (deleted_at);
+
+CREATE OR REPLACE FUNCTION log_document_deletion()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO document_deletions (id) VALUES (OLD.id);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS log_document_deletion ON documents;
+CREATE TRIGGER log_document_deletion
+    AFTER DELETE ON documents
+    FOR EACH ROW
+    EXECUTE FUNCTION log_document_deletion();
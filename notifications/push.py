@@ -2,16 +2,23 @@ import os
 import json
 import requests
 from typing import Dict, Optional
-from firebase_admin import messaging
-import firebase_admin
-from firebase_admin import credentials
 
 class PushNotificationService:
     def __init__(self):
-        # Initialize Firebase Admin SDK
-        cred = credentials.Certificate(os.getenv('FIREBASE_CREDENTIALS_PATH'))
-        if not firebase_admin._apps:
-            firebase_admin.initialize_app(cred)
+        # Firebase Admin SDK is imported and initialized on first send
+        self._messaging = None
+
+    def _firebase_messaging(self):
+        """Initialize Firebase on first use and return its messaging module."""
+        if self._messaging is None:
+            import firebase_admin
+            from firebase_admin import credentials, messaging
+
+            if not firebase_admin._apps:
+                cred = credentials.Certificate(os.getenv('FIREBASE_CREDENTIALS_PATH'))
+                firebase_admin.initialize_app(cred)
+            self._messaging = messaging
+        return self._messaging
             
     def send_push(self, title: str, body: str, data: Optional[Dict] = None) -> bool:
         """
@@ -26,6 +33,8 @@ class PushNotificationService:
             bool: True if notification was sent successfully
         """
         try:
+            messaging = self._firebase_messaging()
+
             # Create message
             message = messaging.Message(
                 notification=messaging.Notification(
@@ -86,9 +95,16 @@ class PushNotificationService:
             print(f'Error sending Expo push notification: {e}')
             return False
 
-# Create global instance
-push_service = PushNotificationService()
+# Global instance, created on first use
+push_service: Optional[PushNotificationService] = None
+
+def get_push_service() -> PushNotificationService:
+    """Return the global push service, creating it on first call"""
+    global push_service
+    if push_service is None:
+        push_service = PushNotificationService()
+    return push_service
 
 def send_push(title: str, body: str, data: Optional[Dict] = None) -> bool:
     """Global function to send push notifications"""
-    return push_service.send_push(title, body, data) 
\ No newline at end of file
+    return get_push_service().send_push(title, body, data) 
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""Tests for the in-process ANN mirror of the documents table."""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import backend.app.db as db
+from backend.app.ann_index import IVFIndex, _top_k
+from backend.app.embeddings import DIM, embed_batch
+
+T0 = datetime(2024, 1, 1)
+
+
+class FakeDocumentsConnection:
+    """Serves the sync queries over in-memory documents and deletions."""
+
+    def __init__(self, docs, deletions=()):
+        # docs: (id, content) or (id, content, created_at); ids double as
+        # created_at seconds when no timestamp is given
+        self.docs = docs
+        self.deletions = list(deletions)  # (id, deleted_at)
+        self._rows = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        if "document_deletions" in query:
+            (since,) = params
+            self._rows = [
+                {"id": doc_id, "deleted_at": deleted_at}
+                for doc_id, deleted_at in self.deletions
+                if deleted_at >= since
+            ]
+            return
+        after_time, after_id, limit = params
+        docs = sorted(
+            (created_at(doc), doc[0], doc[1]) for doc in self.docs
+        )
+        page = [doc for doc in docs if doc[:2] > (after_time, after_id)][:limit]
+        vectors = embed_batch([content for _, _, content in page])
+        self._rows = [
+            {
+                "id": doc_id,
+                "content": content,
+                "embedding": json.dumps(vec.tolist()),
+                "created_at": created,
+            }
+            for (created, doc_id, content), vec in zip(page, vectors)
+        ]
+
+    def fetchall(self):
+        return self._rows
+
+
+def created_at(doc):
+    return doc[2] if len(doc) > 2 else T0 + timedelta(seconds=doc[0])
+
+
+def random_vectors(n, seed=1):
+    rng = np.random.default_rng(seed)
+    # Clustered data so that IVF partitioning is meaningful
+    centers = rng.normal(size=(20, DIM))
+    return (centers[rng.integers(0, 20, n)] + 0.3 * rng.normal(size=(n, DIM))).astype(
+        np.float32
+    )
+
+
+def test_exact_search_before_training():
+    """Small indexes are scanned exhaustively."""
+    index = IVFIndex(directory=None, nlist=8)
+    docs = ["tote bags", "mugs", "pens"]
+    index.add([1, 2, 3], docs, embed_batch(docs))
+
+    results = index.search(embed_batch(["mugs"])[0], k=2)
+
+    assert index.centroids is None
+    assert results[0][0] == "mugs"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert len(results) == 2
+
+
+def test_trained_index_meets_recall_target():
+    """After training, probing follows the measured recall curve."""
+    vectors = random_vectors(2000)
+    index = IVFIndex(directory=None, nlist=16)
+    index.add(list(range(1, 2001)), [str(i) for i in range(1, 2001)], vectors)
+
+    assert index.centroids is not None
+    assert index.probes_for(1.0) == 16
+    assert index.probes_for(0.5) <= index.probes_for(0.95)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    hits = 0
+    for q in range(50):
+        truth = {str(i + 1) for i in _top_k(normalized @ normalized[q], 10)}
+        found = {content for content, _ in index.search(vectors[q], 10, 0.95)}
+        hits += len(truth & found)
+    assert hits / 500 >= 0.85
+
+
+def test_sync_persists_and_reloads(tmp_path):
+    """Synced rows are written to disk and reloaded by a new instance."""
+    conn = FakeDocumentsConnection([(1, "tote bags"), (2, "mugs"), (5, "pens")])
+    index = IVFIndex(directory=str(tmp_path), nlist=4)
+
+    assert index.sync(conn) == 3
+    assert index.is_fresh()
+
+    conn.docs.append((6, "caps"))
+    reloaded = IVFIndex(directory=str(tmp_path), nlist=4)
+    assert len(reloaded) == 3
+    assert reloaded.synced_until == T0 + timedelta(seconds=5)
+    assert reloaded.sync(conn) == 1
+    assert reloaded.search(embed_batch(["caps"])[0], k=1)[0][0] == "caps"
+    assert len(IVFIndex(directory=str(tmp_path), nlist=4)) == 4
+
+
+def test_local_adds_do_not_advance_sync_position():
+    """Rows added by add_doc are skipped, not lost, by the next sync."""
+    index = IVFIndex(directory=None, nlist=4)
+    index.add([2], ["mugs"], embed_batch(["mugs"]))
+
+    index.sync(FakeDocumentsConnection([(1, "tote bags"), (2, "mugs")]))
+
+    assert len(index) == 2
+    assert index.synced_until == T0 + timedelta(seconds=2)
+
+
+def test_sync_picks_up_late_commits_within_overlap():
+    """A lower id that commits after a higher one was mirrored is not lost."""
+    conn = FakeDocumentsConnection([(1, "tote bags"), (3, "pens")])
+    index = IVFIndex(directory=None, nlist=4)
+    index.sync(conn)
+
+    # id 2 started (and took its id and created_at) before id 3 committed
+    conn.docs.append((2, "mugs"))
+
+    assert index.sync(conn) == 1
+    assert sorted(index.contents) == [1, 2, 3]
+
+
+def test_sync_removes_deleted_documents(tmp_path):
+    """Deleted documents disappear from search results and from disk."""
+    conn = FakeDocumentsConnection([(1, "tote bags"), (2, "mugs"), (3, "pens")])
+    index = IVFIndex(directory=str(tmp_path), nlist=4)
+    index.sync(conn)
+
+    del conn.docs[1]
+    conn.deletions.append((2, T0 + timedelta(seconds=10)))
+    index.sync(conn)
+
+    results = index.search(embed_batch(["mugs"])[0], k=3)
+    assert sorted(content for content, _ in results) == ["pens", "tote bags"]
+    assert sorted(index._ids[: len(index)]) == [1, 3]
+    reloaded = IVFIndex(directory=str(tmp_path), nlist=4)
+    assert sorted(reloaded.contents) == [1, 3]
+    assert len(reloaded) == 2
+
+
+def test_save_appends_only_new_contents(tmp_path):
+    """Each sync journals the new documents instead of rewriting every body."""
+    conn = FakeDocumentsConnection([(1, "tote bags"), (2, "mugs")])
+    index = IVFIndex(directory=str(tmp_path), nlist=4)
+    index.sync(conn)
+    journal = tmp_path / "contents.jsonl"
+    before = journal.read_text()
+
+    conn.docs.append((3, "pens"))
+    index.sync(conn)
+
+    assert journal.read_text() == before + json.dumps([3, "pens"]) + "\n"
+
+
+def test_query_similar_uses_fresh_index():
+    """A fresh mirror answers without touching Postgres."""
+    index = IVFIndex(directory=None, nlist=4)
+    index.sync(FakeDocumentsConnection([(1, "tote bags"), (2, "mugs")]))
+
+    with patch("backend.app.db.get_ann_index", return_value=index), \
+            patch("backend.app.db.get_connection") as mock_get_conn:
+        results = db.query_similar("tote bags", k=1)
+
+    mock_get_conn.assert_not_called()
+    assert results[0][0] == "tote bags"
+
+
+def test_query_similar_serves_stale_index_without_database():
+    """A stale mirror is only used when Postgres is unreachable."""
+    index = IVFIndex(directory=None, nlist=4)
+    index.sync(FakeDocumentsConnection([(1, "tote bags"), (2, "mugs")]))
+    index.synced_at = 0
+
+    with patch("backend.app.db.get_ann_index", return_value=index), \
+            patch("backend.app.db.get_connection", side_effect=ConnectionError("down")):
+        results = db.query_similar("mugs", k=1)
+
+    assert results[0][0] == "mugs"
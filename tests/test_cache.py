@@ -0,0 +1,137 @@
+"""Tests for the shared TTL cache."""
+
+from backend.app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_miss_and_ratio():
+    """Hits and misses are counted and reported as a ratio."""
+    cache = TTLCache(max_items=10, ttl=5)
+
+    assert cache.get("a") is None
+    cache.set("a", [1, 2])
+    assert cache.get("a") == [1, 2]
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_entries_expire():
+    """Entries older than the TTL are misses."""
+    clock = FakeClock()
+    cache = TTLCache(max_items=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_generation_bump_invalidates_everything():
+    """invalidate_all makes existing entries stale without touching them."""
+    cache = TTLCache(max_items=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate_all()
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    cache.set("a", 3)
+    assert cache.get("a") == 3
+
+
+def test_set_drops_values_computed_before_an_invalidation():
+    """A read that started before invalidate_all does not store stale data."""
+    cache = TTLCache(max_items=10, ttl=60)
+    generation = cache.generation
+
+    cache.invalidate_all()  # a write lands while the read is in flight
+    cache.set("a", "stale", generation=generation)
+
+    assert cache.get("a") is None
+    cache.set("a", "fresh", generation=cache.generation)
+    assert cache.get("a") == "fresh"
+
+
+def test_size_bound_evicts_least_recently_used():
+    """The cache never holds more than max_items entries."""
+    cache = TTLCache(max_items=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_where():
+    """Entries can be dropped selectively by key."""
+    cache = TTLCache(max_items=10, ttl=60)
+    cache.set(("spec", "mugs", 3), 1)
+    cache.set(("spec", "totes", 3), 2)
+
+    cache.invalidate_where(lambda key: key[1] == "mugs")
+
+    assert cache.get(("spec", "mugs", 3)) is None
+    assert cache.get(("spec", "totes", 3)) == 2
+
+
+def test_set_with_version_drops_only_invalidated_keys():
+    """Key-level invalidations void in-flight fills of that key only."""
+    cache = TTLCache(max_items=10, ttl=60)
+    version = cache.version
+
+    cache.invalidate("a")
+    cache.invalidate_where(lambda key: key[0] == "spec")
+    cache.set("a", 1, version=version)
+    cache.set(("spec", "bags"), 2, version=version)
+    cache.set("b", 3, version=version)
+
+    assert cache.get("a") is None
+    assert cache.get(("spec", "bags")) is None
+    assert cache.get("b") == 3
+
+
+def test_set_with_version_older_than_the_log_is_dropped():
+    """Fills that outlived the invalidation log are not trusted."""
+    cache = TTLCache(max_items=10, ttl=60, log_size=2)
+    version = cache.version
+
+    for key in ("x", "y", "z"):
+        cache.invalidate(key)
+    cache.set("b", 1, version=version)
+
+    assert cache.get("b") is None
+
+
+def test_set_with_quiet_for_drops_recently_invalidated_keys():
+    """Lagging reads are not cached until their key has been quiet long enough."""
+    clock = FakeClock()
+    cache = TTLCache(max_items=10, ttl=60, clock=clock)
+
+    cache.invalidate("a")
+    clock.now = 3.0
+    version = cache.version
+    cache.set("a", 1, version=version, quiet_for=5)
+    cache.set("b", 2, version=version, quiet_for=5)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    clock.now = 6.0
+    cache.set("a", 1, version=version, quiet_for=5)
+    assert cache.get("a") == 1
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 import psycopg
 import backend.app.db as db
 
@@ -9,32 +9,48 @@ class MockConnection:
     
     def __init__(self):
         self.store = []
+        self.queries = []
+        self._rows = []
         
     def __enter__(self):
         return self
         
     def __exit__(self, *args):
         pass
+    
+    def cursor(self):
+        return self
+    
+    def commit(self):
+        pass
         
     def execute(self, query, params=None):
         """Mock execute that simulates basic INSERT/SELECT operations."""
+        self.queries.append((query, params))
         if "INSERT" in query:
             # Store the content (first parameter)
             content = params[0] if params else ""
             self.store.append(content)
-            return Mock()
-        elif "SELECT" in query:
-            # Return mock results with fake similarity scores
-            return Mock(fetchall=lambda: [
-                (content, 0.8) for content in self.store[:3]
-            ])
-        return Mock()
+        elif "FROM documents" in query:
+            # Return mock dict rows with fake similarity scores
+            self._rows = [
+                {"content": content, "similarity": 0.8}
+                for content in self.store[:params["k"]]
+            ]
+        return self
+    
+    def fetchone(self):
+        return {"id": len(self.store)}
+    
+    def fetchall(self):
+        return self._rows
 
 
 @pytest.fixture
 def mock_db():
     """Fixture that provides a mocked database connection."""
     mock_conn = MockConnection()
+    db._query_cache.clear()
     with patch('backend.app.db.get_connection') as mock_get_conn:
         mock_get_conn.return_value.__enter__ = lambda self: mock_conn
         mock_get_conn.return_value.__exit__ = lambda self, *args: None
@@ -62,6 +78,100 @@ def test_query_similar(mock_db):
     assert all(isinstance(r, tuple) and len(r) == 2 for r in results)
 
 
+def test_query_similar_ranks_by_cosine_distance(mock_db):
+    """The query orders by the pgvector cosine operator and applies probes."""
+    db.add_doc("eco friendly tote bags")
+    
+    db.query_similar("tote bags", k=2, probes=7)
+    
+    set_probes, search = mock_db.queries[-2:]
+    assert "ivfflat.probes" in set_probes[0]
+    assert set_probes[1] == ("7",)
+    assert "ORDER BY embedding <=>" in search[0]
+    assert search[1]["k"] == 2
+    assert search[1]["embedding"].startswith("[")
+
+
+def test_query_similar_compact_storage_reranks(mock_db, monkeypatch):
+    """Compact modes search the quantized column, then re-rank exactly."""
+    monkeypatch.setattr(db, "EMBEDDING_STORAGE", "halfvec")
+    db.add_doc("eco friendly tote bags")
+    
+    db.query_similar("tote bags", k=2)
+    
+    query, params = mock_db.queries[-1]
+    assert "embedding_half <=>" in query
+    assert "ORDER BY embedding <=>" in query
+    assert params["candidates"] == 2 * db.RERANK_FACTOR
+
+
+def test_query_similar_hybrid_mode(mock_db):
+    """Hybrid mode fuses full-text and vector rankings in one statement."""
+    db.add_doc("SKU AB-1234 canvas tote")
+    
+    results = db.query_similar("AB-1234", k=1, mode="hybrid")
+    
+    query, params = mock_db.queries[-1]
+    assert "websearch_to_tsquery" in query
+    assert "FULL OUTER JOIN" in query
+    assert params["text"] == "AB-1234"
+    assert params["rrf_k"] == db.RRF_K
+    assert results == [("SKU AB-1234 canvas tote", 0.8)]
+
+
+def test_query_similar_hybrid_compact_storage(mock_db, monkeypatch):
+    """The hybrid vector leg ranks by the compact column the mode indexes."""
+    monkeypatch.setattr(db, "EMBEDDING_STORAGE", "binary")
+    db.add_doc("SKU AB-1234 canvas tote")
+    
+    db.query_similar("AB-1234", k=1, mode="hybrid")
+    
+    query, _ = mock_db.queries[-1]
+    assert "embedding_bit <~>" in query
+    assert "websearch_to_tsquery" in query
+
+
+def test_query_similar_rejects_unknown_mode(mock_db):
+    """Unknown search modes are a programming error."""
+    with pytest.raises(ValueError, match="Unknown search mode"):
+        db.query_similar("tote bags", mode="fuzzy")
+
+
+def test_query_similar_results_are_cached(mock_db):
+    """Repeated queries are served from the cache until a document is added."""
+    db.add_doc("eco friendly tote bags")
+    
+    first = db.query_similar("tote  bags ")
+    second = db.query_similar("tote bags")
+    executed = len(mock_db.queries)
+    db.add_doc("canvas tote bags")
+    third = db.query_similar("tote bags")
+    
+    assert first == second
+    assert len(third) == 2
+    assert len(mock_db.queries) == executed + 2  # one INSERT, one SELECT
+    stats = db.query_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["hit_ratio"] == 1 / 3
+
+
+def test_query_similar_does_not_cache_across_a_concurrent_write(mock_db):
+    """Results read before add_doc invalidated the cache are not stored."""
+    db.add_doc("eco friendly tote bags")
+    search = db._search_documents
+    
+    def search_then_write(*args):
+        results = search(*args)
+        db.add_doc("canvas tote bags")  # commits while the query is in flight
+        return results
+    
+    with patch.object(db, "_search_documents", side_effect=search_then_write):
+        db.query_similar("tote bags")
+    
+    assert len(db.query_similar("tote bags")) == 2
+    assert db.query_cache_stats()["hits"] == 0
+
+
 def test_add_and_query_workflow(mock_db):
     """Test the complete workflow of adding and querying documents."""
     # Add several documents
@@ -84,6 +194,169 @@ def test_add_and_query_workflow(mock_db):
         assert isinstance(similarity, (int, float))
 
 
+def test_add_docs_streams_copy_in_chunks():
+    """Bulk ingestion embeds in chunks and writes every row through COPY."""
+    mock_conn = MagicMock()
+    copy = mock_conn.cursor.return_value.__enter__.return_value.copy
+    copy_ctx = copy.return_value.__enter__.return_value
+    docs = (f"quote email {i}" for i in range(5))
+    
+    with patch('backend.app.db.get_connection') as mock_get_conn, \
+            patch('pgvector.psycopg.register_vector'), \
+            patch('backend.app.db.cached_embed_batch', wraps=db.cached_embed_batch) as embed:
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        stats = db.add_docs(docs, chunk_size=2)
+    
+    assert "FORMAT BINARY" in copy.call_args[0][0]
+    cursor = mock_conn.cursor.return_value.__enter__.return_value
+    cursor.execute.assert_called_once_with("SET LOCAL statement_timeout = 0")
+    copy_ctx.set_types.assert_called_once_with(["text", "vector"])
+    assert copy_ctx.write_row.call_count == 5
+    assert [len(call.args[0]) for call in embed.call_args_list] == [2, 2, 1]
+    mock_conn.commit.assert_called_once()
+    assert stats["rows"] == 5
+    assert stats["rows_per_second"] >= 0
+
+
+def test_get_connection_borrows_from_pool():
+    """Once the pool is open, connections come from it instead of connect()."""
+    with patch('backend.app.db.ConnectionPool') as mock_pool_cls, \
+            patch('backend.app.db.psycopg.connect') as mock_connect:
+        pool = mock_pool_cls.return_value
+        pooled = pool.connection.return_value.__enter__.return_value
+        try:
+            assert db.open_pool() is pool
+            assert db.open_pool() is pool  # idempotent
+            with db.get_connection() as conn:
+                assert conn is pooled
+            db.pool_stats()
+        finally:
+            db.close_pool()
+    
+    kwargs = mock_pool_cls.call_args.kwargs
+    assert kwargs["min_size"] == db.DB_POOL_MIN_SIZE
+    assert kwargs["max_size"] == db.DB_POOL_MAX_SIZE
+    assert kwargs["max_idle"] == db.DB_POOL_MAX_IDLE
+    assert kwargs["check"] is not None
+    mock_pool_cls.assert_called_once()
+    pool.open.assert_called_once()
+    pool.get_stats.assert_called_once()
+    pool.close.assert_called_once()
+    mock_connect.assert_not_called()
+    assert db.pool_stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_get_async_connection_borrows_from_async_pool():
+    """The async pool backs get_async_connection once opened."""
+    with patch('backend.app.db.AsyncConnectionPool') as mock_pool_cls:
+        pool = mock_pool_cls.return_value
+        pool.open = AsyncMock()
+        pool.close = AsyncMock()
+        pooled = pool.connection.return_value.__aenter__.return_value
+        try:
+            await db.open_async_pool()
+            async with db.get_async_connection() as conn:
+                assert conn is pooled
+        finally:
+            await db.close_async_pool()
+    
+    pool.open.assert_awaited_once()
+    pool.close.assert_awaited_once()
+
+
+def make_pool(name, lag=0.0):
+    """Mock sync pool whose connections report ``lag`` seconds of replay lag."""
+    pool = Mock()
+    pool.name = name
+    conn = pool.getconn.return_value
+    conn.execute.return_value.fetchone.return_value = {"lag": lag}
+    return pool
+
+
+def test_readonly_routes_to_replica_until_request_writes():
+    """Reads go to a caught-up replica, but stick to the primary after a write."""
+    primary = MagicMock()
+    replica = make_pool("replica-0")
+    with patch.object(db, "_pool", primary), \
+            patch.object(db, "_replica_pools", [replica]), \
+            patch.object(db, "_replica_lag", {}):
+        with db.request_scope():
+            with db.get_connection(readonly=True) as conn:
+                assert conn is replica.getconn.return_value
+            with db.get_connection():
+                pass
+            with db.get_connection(readonly=True) as conn:
+                assert conn is primary.connection.return_value.__enter__.return_value
+
+    replica.getconn.assert_called_once()
+    replica.putconn.assert_called_once_with(replica.getconn.return_value)
+    assert primary.connection.call_count == 2
+
+
+def test_lagging_replica_is_skipped_and_lag_is_cached():
+    """Replicas behind by more than REPLICA_MAX_LAG fall back to the next one."""
+    behind = make_pool("replica-0", lag=db.REPLICA_MAX_LAG + 1)
+    fresh = make_pool("replica-1")
+    with patch.object(db, "_pool", MagicMock()), \
+            patch.object(db, "_replica_pools", [behind, fresh]), \
+            patch.object(db, "_replica_lag", {}), \
+            patch.object(db, "_replica_turn", iter([0, 0])):
+        for _ in range(2):
+            with db.get_connection(readonly=True) as conn:
+                assert conn is fresh.getconn.return_value
+
+    # The lag query runs once per replica; the second read uses the cache
+    # and does not borrow from the lagging replica at all
+    behind.getconn.return_value.execute.assert_called_once()
+    fresh.getconn.return_value.execute.assert_called_once()
+    behind.getconn.assert_called_once()
+    behind.putconn.assert_called_once()
+
+
+def test_unreachable_replica_is_not_retried_until_next_check():
+    """A replica that fails to connect is cached as infinitely behind."""
+    down = make_pool("replica-0")
+    down.getconn.side_effect = db.PoolTimeout("no connection")
+    fresh = make_pool("replica-1")
+    with patch.object(db, "_pool", MagicMock()), \
+            patch.object(db, "_replica_pools", [down, fresh]), \
+            patch.object(db, "_replica_lag", {}), \
+            patch.object(db, "_replica_turn", iter([0, 0])):
+        for _ in range(2):
+            with db.get_connection(readonly=True) as conn:
+                assert conn is fresh.getconn.return_value
+        assert db._replica_lag["replica-0"][1] == float("inf")
+
+    down.getconn.assert_called_once()
+
+
+def test_from_replica_tells_borrowed_replicas_apart():
+    """Only connections borrowed from a replica, while borrowed, count."""
+    primary = MagicMock()
+    replica = make_pool("replica-0", lag=2.5)
+    with patch.object(db, "_pool", primary), \
+            patch.object(db, "_replica_pools", [replica]), \
+            patch.object(db, "_replica_lag", {}):
+        with db.request_scope():
+            assert not db.request_wrote()
+            with db.get_connection(readonly=True) as conn:
+                assert db.from_replica(conn)
+            with db.get_connection() as conn:
+                assert not db.from_replica(conn)
+            assert db.request_wrote()
+    
+    assert not db.from_replica(replica.getconn.return_value)
+
+
+def test_readonly_falls_back_to_primary_without_replicas():
+    """Without REPLICA_DSNS read-only calls use the primary."""
+    primary = MagicMock()
+    with patch.object(db, "_pool", primary), patch.object(db, "_replica_pools", []):
+        with db.get_connection(readonly=True) as conn:
+            assert conn is primary.connection.return_value.__enter__.return_value
+
+
 def test_init_db_success():
     """Test successful database initialization."""
     with patch('backend.app.db.get_connection') as mock_conn:
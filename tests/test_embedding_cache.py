@@ -0,0 +1,95 @@
+"""Tests for the content-addressed embedding cache."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from backend.app.embedding_cache import DiskEmbeddingStore, EmbeddingCache
+from backend.app.embeddings import DIM, embed_batch
+
+
+def test_memory_hits_and_misses():
+    """Repeated texts are served from the LRU layer."""
+    cache = EmbeddingCache(max_items=10, directory=None)
+
+    first = cache.embed_batch(["tote bags", "mugs", "tote bags"])
+    second = cache.embed_batch(["mugs"])
+
+    assert np.array_equal(first, embed_batch(["tote bags", "mugs", "tote bags"]))
+    assert np.array_equal(second[0], first[1])
+    stats = cache.stats()
+    assert stats["misses"] == 3
+    assert stats["memory_hits"] == 1
+    assert stats["memory_items"] == 2
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted when the bound is reached."""
+    cache = EmbeddingCache(max_items=2, directory=None)
+
+    cache.embed_batch(["a", "b"])
+    cache.embed_batch(["a"])  # "b" becomes least recently used
+    cache.embed_batch(["c"])
+
+    assert cache.stats()["memory_evictions"] == 1
+    cache.embed_batch(["a"])
+    assert cache.stats()["memory_hits"] == 2
+    cache.embed_batch(["b"])
+    assert cache.stats()["misses"] == 4
+
+
+def test_disk_store_survives_restart(tmp_path):
+    """A new cache over the same directory starts warm."""
+    cold = EmbeddingCache(max_items=10, directory=str(tmp_path), disk_slots=8)
+    expected = cold.embed_batch(["quote boilerplate", "rfq spec"])
+
+    warm = EmbeddingCache(max_items=10, directory=str(tmp_path), disk_slots=8)
+    result = warm.embed_batch(["rfq spec", "quote boilerplate"])
+
+    assert np.array_equal(result, expected[::-1])
+    stats = warm.stats()
+    assert stats["disk_hits"] == 2
+    assert stats["misses"] == 0
+
+
+def test_disk_store_overwrites_oldest_slot(tmp_path):
+    """The disk layer is bounded and replaces its oldest entries."""
+    cache = EmbeddingCache(max_items=1, directory=str(tmp_path), disk_slots=2)
+
+    cache.embed_batch(["one", "two", "three"])
+
+    stats = cache.stats()
+    assert stats["disk_items"] == 2
+    assert stats["disk_evictions"] == 1
+
+    reopened = EmbeddingCache(max_items=10, directory=str(tmp_path), disk_slots=2)
+    reopened.embed_batch(["one", "two", "three"])
+    assert reopened.stats()["disk_hits"] == 2
+    assert reopened.stats()["misses"] == 1
+
+
+def test_torn_write_is_not_served_after_restart(tmp_path):
+    """A crash while overwriting a slot loses the entry, never mislabels it."""
+    store = DiskEmbeddingStore(str(tmp_path), slots=2)
+    vectors = np.arange(3 * DIM, dtype=np.float32).reshape(3, DIM)
+    store.put_many([b"a" * 32, b"b" * 32], vectors[:2])
+
+    # Crash once the new vector is in the file but before its key is
+    with patch.object(store._vectors, "flush", side_effect=OSError("crash")):
+        with pytest.raises(OSError):
+            store.put_many([b"c" * 32], vectors[2:])
+
+    reopened = DiskEmbeddingStore(str(tmp_path), slots=2)
+    assert reopened.get(b"a" * 32) is None
+    assert reopened.get(b"c" * 32) is None
+    assert np.array_equal(reopened.get(b"b" * 32), vectors[1])
+
+
+def test_cached_rows_do_not_pin_the_batch():
+    """Each cached vector owns its data rather than viewing the batch matrix."""
+    cache = EmbeddingCache(max_items=10, directory=None)
+
+    cache.embed_batch(["a", "b", "c"])
+
+    assert all(vector.base is None for vector in cache._memory.values())
@@ -0,0 +1,51 @@
+"""Tests for the hash-based embedding functions."""
+
+import hashlib
+import struct
+
+import numpy as np
+
+from backend.app.embeddings import DIM, embed, embed_batch
+
+
+def reference_embed(text):
+    """The original one-float-at-a-time implementation."""
+    embeddings = []
+    for i in range(DIM // 8):
+        h = hashlib.sha256(f"{text}:{i}".encode()).digest()
+        for j in range(8):
+            val = struct.unpack(">I", h[j * 4:(j + 1) * 4])[0]
+            embeddings.append((val / 2**32) * 2 - 1)
+    return embeddings
+
+
+TEXTS = ["hello world email", "eco friendly tote bags", "", "£12.50 per unit ✓"]
+
+
+def test_embed_matches_reference():
+    """embed() must stay bit-for-bit identical to the scalar implementation."""
+    for text in TEXTS:
+        assert embed(text) == reference_embed(text)
+
+
+def test_embed_batch_shape_and_layout():
+    """embed_batch returns a contiguous float32 matrix."""
+    matrix = embed_batch(TEXTS)
+
+    assert matrix.shape == (len(TEXTS), DIM)
+    assert matrix.dtype == np.float32
+    assert matrix.flags["C_CONTIGUOUS"]
+
+
+def test_embed_batch_matches_float32_of_embed():
+    """Each row equals the float32 rounding of the scalar embedding."""
+    matrix = embed_batch(TEXTS)
+
+    for row, text in zip(matrix, TEXTS):
+        expected = np.asarray(reference_embed(text), dtype=np.float32)
+        assert np.array_equal(row, expected)
+
+
+def test_embed_batch_empty():
+    """An empty batch yields an empty matrix with the right width."""
+    assert embed_batch([]).shape == (0, DIM)
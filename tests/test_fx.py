@@ -0,0 +1,37 @@
+"""Tests for currency normalization."""
+
+import json
+
+import pytest
+
+from backend.app import fx
+
+
+def test_currency_code_maps_parser_symbols():
+    assert fx.currency_code("$") == "USD"
+    assert fx.currency_code("€") == "EUR"
+    assert fx.currency_code("£") == "GBP"
+    assert fx.currency_code(" gbp ") == "GBP"
+    assert fx.currency_code(None) == "USD"
+    assert fx.currency_code("12") is None
+
+
+def test_to_usd_uses_rate_table():
+    rates = {"USD": 1.0, "EUR": 1.1}
+    assert fx.usd_rate("€", rates) == 1.1
+    assert fx.usd_rate("¢", rates) == pytest.approx(0.01)
+    assert fx.usd_rate("XYZ", rates) is None
+
+    assert fx.to_usd(10, "$") == 10.0
+    assert fx.to_usd(None, "$") is None
+    assert fx.to_usd(10, "XYZ") is None
+
+
+def test_reload_rates_reads_local_file(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({"usd_per_unit": {"usd": 1, "EUR": 2}}))
+    try:
+        assert fx.reload_rates(str(path)) == {"USD": 1.0, "EUR": 2.0}
+        assert fx.to_usd(3, "€") == 6.0
+    finally:
+        fx.reload_rates()
@@ -0,0 +1,69 @@
+"""Tests for per-statement latency instrumentation."""
+
+import logging
+from unittest.mock import patch
+
+import backend.app.db as db
+from backend.app.instrumentation import (
+    InstrumentedCursor,
+    LatencyHistogram,
+    QueryStats,
+    fingerprint,
+)
+
+
+def test_fingerprint_ignores_arguments_and_layout():
+    a = fingerprint("SELECT * FROM offers\n  WHERE id = %s -- hot path")
+    b = fingerprint("SELECT * FROM offers WHERE id = 42")
+    c = fingerprint("SELECT * FROM offers WHERE status IN ('a', 'b', 'c')")
+
+    assert a == b == "SELECT * FROM offers WHERE id = ?"
+    assert c == "SELECT * FROM offers WHERE status IN (...)"
+    assert fingerprint("UPDATE t SET x = %(x)s") == "UPDATE t SET x = ?"
+
+
+def test_fingerprint_merges_multi_row_values():
+    two = fingerprint("INSERT INTO offers (a, b) VALUES (%s, %s), (%s, %s)")
+    three = fingerprint("INSERT INTO offers (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)")
+
+    assert two == three == "INSERT INTO offers (a, b) VALUES (...), ..."
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = LatencyHistogram()
+    for ms in [0.5] * 90 + [40] * 9 + [3000]:
+        histogram.observe(ms)
+
+    stats = histogram.as_dict()
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == 1
+    assert stats["p95_ms"] == 50
+    assert stats["p99_ms"] == 50
+    assert stats["max_ms"] == 3000
+
+
+def test_slow_queries_are_logged_with_redacted_params(caplog):
+    stats = QueryStats(slow_ms=100)
+    with caplog.at_level(logging.WARNING, logger="backend.app.slow_queries"):
+        stats.record("SELECT * FROM offers WHERE supplier_email = %s", 0.01, ("x",))
+        stats.record(
+            "SELECT * FROM offers WHERE supplier_email = %s", 0.25, ("a@b.com",)
+        )
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "a@b.com" not in message
+    assert "<str>" in message
+    assert stats.snapshot()["SELECT * FROM offers WHERE supplier_email = ?"][
+        "count"
+    ] == 2
+
+
+def test_connections_are_instrumented_with_statement_timeout():
+    with patch.object(db, "DB_STATEMENT_TIMEOUT_MS", 5000):
+        kwargs = db._connection_kwargs(InstrumentedCursor)
+
+    assert kwargs["cursor_factory"] is InstrumentedCursor
+    assert kwargs["options"] == "-c statement_timeout=5000"
+    with patch.object(db, "DB_STATEMENT_TIMEOUT_MS", 0):
+        assert "options" not in db._connection_kwargs(InstrumentedCursor)
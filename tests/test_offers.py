@@ -1,10 +1,71 @@
 """Tests for offer management functionality."""
 
 import pytest
-from unittest.mock import patch, Mock, MagicMock
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime
 
-from backend.app.offers import OfferManager, OfferError, store_offer
+from backend.app import db
+from backend.app.fx import to_usd
+from backend.app.offers import (
+    InvalidCursorError,
+    OfferError,
+    OfferManager,
+    _offer_cache,
+    canonical_spec,
+    decode_cursor,
+    encode_cursor,
+    ensure_offer_partitions,
+    histogram_percentile,
+    invalidate_offer,
+    next_cursor,
+    offer_cache_stats,
+    price_bucket,
+    store_offer,
+)
+
+
+def make_async_cursor():
+    """Mock cursor whose query methods are awaitable."""
+    mock_cursor = MagicMock()
+    mock_cursor.execute = AsyncMock()
+    mock_cursor.executemany = AsyncMock()
+    mock_cursor.fetchone = AsyncMock()
+    mock_cursor.fetchall = AsyncMock()
+    return mock_cursor
+
+
+@contextmanager
+def mock_async_db(mock_cursor):
+    """Patch get_async_connection to yield a connection using ``mock_cursor``."""
+    mock_conn = MagicMock()
+    mock_conn.cursor.return_value.__aenter__.return_value = mock_cursor
+    mock_conn.commit = AsyncMock()
+    with patch('backend.app.offers.get_async_connection') as mock_get_conn:
+        mock_get_conn.return_value.__aenter__.return_value = mock_conn
+        yield mock_conn
+
+
+def make_async_replica(name, mock_cursor, lag=0.0):
+    """Mock async replica pool whose connections use ``mock_cursor``."""
+    pool = MagicMock()
+    pool.name = name
+    conn = MagicMock()
+    conn.cursor.return_value.__aenter__.return_value = mock_cursor
+    lag_cursor = MagicMock()
+    lag_cursor.fetchone = AsyncMock(return_value={"lag": lag})
+    conn.execute = AsyncMock(return_value=lag_cursor)
+    pool.getconn = AsyncMock(return_value=conn)
+    pool.putconn = AsyncMock()
+    return pool
+
+
+@pytest.fixture(autouse=True)
+def clear_offer_cache():
+    """Cached rows from one test must not answer another test's query."""
+    _offer_cache.clear()
+    yield
+    _offer_cache.clear()
 
 
 class TestOfferManager:
@@ -78,15 +139,10 @@ class TestOfferManager:
         spec = "eco-friendly tote bags"
         
         # Mock database connection and cursor
-        mock_cursor = Mock()
-        mock_cursor.fetchone.return_value = [123]  # Return offer ID
-        
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {"id": 123}  # Return offer ID
         
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor) as mock_conn:
             offer_id = await OfferManager.store_offer(offer_data, supplier_info, spec)
             
             assert offer_id == 123
@@ -113,12 +169,243 @@ class TestOfferManager:
         spec = "test product"
         
         # Mock database connection to raise error
-        with patch('backend.app.offers.get_connection') as mock_get_conn:
+        with patch('backend.app.offers.get_async_connection') as mock_get_conn:
             mock_get_conn.side_effect = Exception("Database connection failed")
             
             with pytest.raises(OfferError, match="Failed to store offer"):
                 await OfferManager.store_offer(offer_data, supplier_info, spec)
     
+    @pytest.mark.asyncio
+    async def test_store_offers_batch(self):
+        """A batch is inserted with one statement; invalid rows are reported."""
+        supplier_info = {"name": "Test Supplier"}
+        batch = [
+            ({"price": 10.0, "currency": "USD"}, supplier_info, "bags"),
+            ({"price": -1}, supplier_info, "bags"),
+            ({"price": 12.0, "currency": "EUR"}, supplier_info, "bags"),
+        ]
+        
+        mock_cursor = make_async_cursor()
+        # Ids are drawn first and inserted with their rows
+        mock_cursor.fetchall.return_value = [{"id": 8}, {"id": 7}]
+        
+        with mock_async_db(mock_cursor) as mock_conn:
+            result = await OfferManager.store_offers(batch)
+        
+        assert result["ids"] == [8, None, 7]
+        assert result["errors"] == {1: "Price cannot be negative"}
+        draw, insert = mock_cursor.execute.call_args_list
+        assert draw[0][1] == (2,)
+        query, params = insert[0]
+        assert "OVERRIDING SYSTEM VALUE" in query and "RETURNING" not in query
+        assert query.count("(%s, %s, %s") == 2
+        assert len(params) == 30 and params[0] == 8 and params[15] == 7
+        assert params[6] == 10.0 and params[21] == 12.0
+        # price_usd is converted at store time
+        assert params[7] == 10.0 and params[22] == to_usd(12.0, "EUR")
+        mock_conn.commit.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_store_offers_all_invalid_skips_database(self):
+        """Nothing is sent to the database when every row is rejected."""
+        with patch('backend.app.offers.get_async_connection') as mock_get_conn:
+            result = await OfferManager.store_offers([({"price": "abc"}, {}, "bags")])
+        
+        assert result == {"ids": [None], "errors": {0: "Price must be a valid number"}}
+        mock_get_conn.assert_not_called()
+    
+    def test_page_cursor_round_trip(self):
+        """Cursors are opaque tokens over the (created_at, id) keyset."""
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        token = encode_cursor({"id": 42, "created_at": created_at})
+        
+        assert decode_cursor(token) == (created_at, 42)
+        assert next_cursor([{"id": 42, "created_at": created_at}], limit=1) == token
+        assert next_cursor([{"id": 42, "created_at": created_at}], limit=2) is None
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+    
+    def test_canonical_spec_collapses_case_and_whitespace(self):
+        """Spellings that differ only in case, spacing or width share a key."""
+        assert canonical_spec("Eco tote bags") == "eco tote bags"
+        assert canonical_spec("  eco\ttote  BAGS ") == "eco tote bags"
+        assert canonical_spec("ｅｃｏ tote bags") == "eco tote bags"
+        assert canonical_spec(None) == ""
+    
+    @pytest.mark.asyncio
+    async def test_spec_lookups_use_spec_key(self):
+        """Listing, cheapest and summary lookups all match on the canonical key."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.return_value = []
+        
+        with mock_async_db(mock_cursor):
+            await OfferManager.get_offers_by_spec("Eco  Tote Bags", limit=5)
+            await OfferManager.get_cheapest_offers(" eco tote bags", limit=3)
+            await OfferManager.get_offers_summary("ECO tote bags")
+        
+        for call in mock_cursor.execute.call_args_list:
+            query, params = call[0]
+            assert "eco tote bags" in params
+        assert "spec_key = %s" in mock_cursor.execute.call_args_list[0][0][0]
+    
+    @pytest.mark.asyncio
+    async def test_get_landed_cost_offers_fetches_only_winners(self):
+        """Candidates are scored in bulk; only the top offers are loaded in full."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.side_effect = [
+            [
+                (1, 10.0, "USD", 0, None, 10.0),
+                (2, 4.0, "EUR", 0, None, 4.4),
+                (3, 5.0, "", 0, 900, 5.0),
+            ],
+            [{"id": 3, "supplier_name": "C"}, {"id": 2, "supplier_name": "B"}],
+        ]
+        
+        with mock_async_db(mock_cursor):
+            offers = await OfferManager.get_landed_cost_offers(
+                "Tote Bags", limit=2, quantity=1000
+            )
+        
+        assert [offer["id"] for offer in offers] == [2, 3]
+        assert all("landed_cost" in offer for offer in offers)
+        candidates, winners = mock_cursor.execute.call_args_list
+        assert candidates[0][1] == ("tote bags",)
+        assert "id = ANY(%s)" in winners[0][0] and winners[0][1] == ([2, 3],)
+    
+    @pytest.mark.asyncio
+    async def test_get_offers_by_spec_after_cursor(self):
+        """A cursor switches to the keyset statement instead of OFFSET."""
+        created_at = datetime(2024, 5, 1, 12, 0)
+        token = encode_cursor({"id": 7, "created_at": created_at})
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.return_value = []
+        
+        with mock_async_db(mock_cursor):
+            await OfferManager.get_offers_by_spec("bags", limit=10, after=token)
+        
+        query, params = mock_cursor.execute.call_args[0]
+        assert "(created_at, id) < (%s, %s)" in query
+        assert "OFFSET" not in query
+        # The plain created_at bound lets Postgres prune newer partitions
+        assert "created_at <= %s" in query
+        assert params == ("bags", created_at, created_at, 7, 10)
+    
+    @pytest.mark.asyncio
+    async def test_search_offers_after_cursor(self):
+        """Search filters combine with the keyset condition."""
+        created_at = datetime(2024, 5, 1, 12, 0)
+        token = encode_cursor({"id": 7, "created_at": created_at})
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.return_value = []
+        
+        with mock_async_db(mock_cursor):
+            await OfferManager.search_offers(status="pending", limit=5, after=token)
+        
+        query, params = mock_cursor.execute.call_args[0]
+        assert query.endswith("ORDER BY created_at DESC, id DESC LIMIT %s")
+        assert "created_at <= %s AND (created_at, id) < (%s, %s)" in query
+        assert params == ["pending", created_at, created_at, 7, 5]
+    
+    @pytest.mark.asyncio
+    async def test_search_offers_price_bounds_use_usd(self):
+        """Min/max price filters compare the normalized USD price."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.return_value = []
+        
+        with mock_async_db(mock_cursor):
+            await OfferManager.search_offers(min_price=5, max_price=20)
+        
+        query, params = mock_cursor.execute.call_args[0]
+        assert "price_usd >= %s" in query and "price_usd <= %s" in query
+        assert params == [5, 20, 50]
+    
+    @pytest.mark.asyncio
+    async def test_search_offers_ranks_trigram_matches(self):
+        """A search term uses the trigram operators and orders by similarity."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.return_value = [
+            {"id": 3, "created_at": datetime(2024, 5, 1), "match_score": 0.75}
+        ]
+        
+        with mock_async_db(mock_cursor):
+            offers = await OfferManager.search_offers(search_term="tote bgs", limit=1)
+        
+        query, params = mock_cursor.execute.call_args[0]
+        assert "AS match_score" in query and "<%% product_spec" in query
+        assert "ORDER BY match_score DESC, created_at DESC, id DESC" in query
+        assert params == ["tote bgs"] * 3 + ["%tote bgs%"] * 3 + ["tote bgs"] * 3 + [1]
+        
+        # The next-page token carries the score so ranked pages stay stable
+        token = next_cursor(offers, limit=1)
+        assert decode_cursor(token) == (0.75, datetime(2024, 5, 1), 3)
+        with mock_async_db(mock_cursor):
+            await OfferManager.search_offers(search_term="tote bgs", after=token)
+        query, params = mock_cursor.execute.call_args[0]
+        assert "created_at, id) < (%s, %s, %s)" in query
+        assert params[-4:] == [0.75, datetime(2024, 5, 1), 3, 50]
+        
+        with pytest.raises(InvalidCursorError):
+            await OfferManager.search_offers(after=token)
+    
+    def test_histogram_percentile_estimates_within_a_bucket(self):
+        """Log-bucket percentiles stay within ~6% of the exact value."""
+        prices = [1.0 + i * 0.37 for i in range(1000)]
+        histogram = [0] * 160
+        for price in prices:
+            histogram[price_bucket(price)] += 1
+        
+        for q in (0.1, 0.5, 0.9):
+            exact = sorted(prices)[int(q * len(prices)) - 1]
+            estimate = histogram_percentile(histogram, q, min(prices), max(prices))
+            assert estimate == pytest.approx(exact, rel=0.07)
+        assert histogram_percentile([0] * 160, 0.5) is None
+    
+    @pytest.mark.asyncio
+    async def test_get_offers_summary_reads_summary_table(self):
+        """Per-spec rows are totalled in SQL without scanning offers."""
+        histogram = [0] * 160
+        for price in (10.0, 20.0, 40.0):
+            histogram[price_bucket(price)] += 1
+        
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {
+            "total_offers": 4, "pending_offers": 3,
+            "accepted_offers": 0, "rejected_offers": 0,
+            "priced_offers": 3, "price_sum": 70.0,
+            "min_price": 10.0, "max_price": 40.0, "price_histogram": histogram,
+        }
+        
+        with mock_async_db(mock_cursor):
+            summary = await OfferManager.get_offers_summary()
+        
+        query = mock_cursor.execute.call_args[0][0]
+        assert "FROM offer_spec_summary" in query and "FROM offers" not in query
+        assert "SUM(h.count)" in query and "WHERE" not in query
+        assert summary["total_offers"] == 4
+        assert summary["pending_offers"] == 3
+        assert summary["avg_price"] == pytest.approx(70.0 / 3)
+        assert (summary["min_price"], summary["max_price"]) == (10.0, 40.0)
+        assert summary["p50_price"] == pytest.approx(20.0, rel=0.07)
+        assert summary["p10_price"] == pytest.approx(10.0, rel=0.07)
+    
+    @pytest.mark.asyncio
+    async def test_get_offers_summary_without_offers(self):
+        """An empty summary table yields zero counts and no prices."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {
+            "total_offers": 0, "pending_offers": 0,
+            "accepted_offers": 0, "rejected_offers": 0,
+            "priced_offers": 0, "price_sum": 0,
+            "min_price": None, "max_price": None, "price_histogram": None,
+        }
+        
+        with mock_async_db(mock_cursor):
+            summary = await OfferManager.get_offers_summary()
+        
+        assert summary["total_offers"] == 0
+        assert summary["avg_price"] is None
+        assert summary["p50_price"] is None
+    
     @pytest.mark.asyncio
     async def test_get_offers_by_spec_success(self):
         """Test successful retrieval of offers by specification."""
@@ -150,15 +437,10 @@ class TestOfferManager:
         ]
         
         # Mock database connection and cursor
-        mock_cursor = Mock()
+        mock_cursor = make_async_cursor()
         mock_cursor.fetchall.return_value = mock_offers
         
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
-        
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor):
             offers = await OfferManager.get_offers_by_spec(spec)
             
             assert len(offers) == 2
@@ -174,15 +456,10 @@ class TestOfferManager:
         
         mock_offers = [{"id": 1, "supplier_name": "Supplier A"}]
         
-        mock_cursor = Mock()
+        mock_cursor = make_async_cursor()
         mock_cursor.fetchall.return_value = mock_offers
         
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
-        
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor):
             offers = await OfferManager.get_offers_by_spec(spec, limit)
             
             assert len(offers) == 1
@@ -207,15 +484,10 @@ class TestOfferManager:
             {"id": 2, "supplier_email": "supplier@example.com", "spec": "product B"}
         ]
         
-        mock_cursor = Mock()
+        mock_cursor = make_async_cursor()
         mock_cursor.fetchall.return_value = mock_offers
         
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
-        
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor):
             offers = await OfferManager.get_offers_by_supplier(supplier_email)
             
             assert len(offers) == 2
@@ -233,15 +505,10 @@ class TestOfferManager:
             "price": 25.50
         }
         
-        mock_cursor = Mock()
+        mock_cursor = make_async_cursor()
         mock_cursor.fetchone.return_value = mock_offer
         
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
-        
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor):
             offer = await OfferManager.get_offer_by_id(offer_id)
             
             assert offer is not None
@@ -253,15 +520,10 @@ class TestOfferManager:
         """Test retrieval of non-existent offer by ID."""
         offer_id = 999
         
-        mock_cursor = Mock()
+        mock_cursor = make_async_cursor()
         mock_cursor.fetchone.return_value = None
         
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
-        
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor):
             offer = await OfferManager.get_offer_by_id(offer_id)
             
             assert offer is None
@@ -281,36 +543,175 @@ class TestOfferManager:
         offer_id = 123
         status = "accepted"
         
-        mock_cursor = Mock()
-        mock_cursor.fetchone.return_value = [offer_id]  # Return updated offer ID
-        
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {"spec_key": "test product"}
+        mock_cursor.rowcount = 1
         
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor) as mock_conn:
             result = await OfferManager.update_offer_status(offer_id, status)
             
             assert result is True
             mock_cursor.execute.assert_called_once()
             mock_conn.commit.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_get_offer_by_id_served_from_cache(self):
+        """Repeat lookups skip the database and return independent copies."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {"id": 7, "product_spec": "bags"}
+        
+        with mock_async_db(mock_cursor):
+            first = await OfferManager.get_offer_by_id(7)
+            first["price"] = 1
+            second = await OfferManager.get_offer_by_id(7)
+        
+        assert mock_cursor.execute.await_count == 1
+        assert "price" not in second
+        assert offer_cache_stats()["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_clean_request_fills_cache_from_replica(self):
+        """Misses read a caught-up replica and later lookups hit the cache."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {"id": 7, "product_spec": "bags"}
+        replica = make_async_replica("replica-0", mock_cursor)
+        primary = MagicMock()
+        with patch.object(db, "_async_pool", primary), \
+                patch.object(db, "_async_replica_pools", [replica]), \
+                patch.object(db, "_replica_lag", {}):
+            with db.request_scope():
+                await OfferManager.get_offer_by_id(7)
+                offer = await OfferManager.get_offer_by_id(7)
+        
+        assert offer["id"] == 7
+        replica.getconn.assert_awaited_once()
+        primary.connection.assert_not_called()
+        assert offer_cache_stats()["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_request_that_wrote_reads_past_the_cache(self):
+        """After its own write a request reads the primary, not the cache."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {"id": 7, "status": "pending"}
+        replica = make_async_replica("replica-0", mock_cursor)
+        primary_conn = MagicMock()
+        primary_conn.cursor.return_value.__aenter__.return_value = mock_cursor
+        primary = MagicMock()
+        primary.connection.return_value.__aenter__.return_value = primary_conn
+        with patch.object(db, "_async_pool", primary), \
+                patch.object(db, "_async_replica_pools", [replica]), \
+                patch.object(db, "_replica_lag", {}):
+            await OfferManager.get_offer_by_id(7)
+            with db.request_scope():
+                db._note_primary_use()
+                await OfferManager.get_offer_by_id(7)
+        
+        replica.getconn.assert_awaited_once()
+        primary.connection.assert_called_once()
+        assert offer_cache_stats()["hits"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_replica_reads_after_a_recent_invalidation_are_not_cached(self):
+        """A lagging replica may still return the row a write just replaced."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {"id": 7, "status": "pending"}
+        replica = make_async_replica("replica-0", mock_cursor, lag=3.0)
+        with patch.object(db, "_async_pool", MagicMock()), \
+                patch.object(db, "_async_replica_pools", [replica]), \
+                patch.object(db, "_replica_lag", {}):
+            invalidate_offer(7)  # update_offer_status committed "accepted"
+            await OfferManager.get_offer_by_id(7)
+            await OfferManager.get_offer_by_id(7)
+        
+        assert replica.getconn.await_count == 2
+        assert offer_cache_stats()["size"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_during_read_is_not_overwritten(self):
+        """A row read before a write committed is not cached after it."""
+        mock_cursor = make_async_cursor()
+        
+        async def fetch_then_write():
+            invalidate_offer(7)  # a writer commits while the read is in flight
+            return {"id": 7, "status": "pending"}
+        
+        mock_cursor.fetchone.side_effect = fetch_then_write
+        with mock_async_db(mock_cursor):
+            await OfferManager.get_offer_by_id(7)
+            mock_cursor.fetchone.side_effect = None
+            mock_cursor.fetchone.return_value = {"id": 7, "status": "accepted"}
+            offer = await OfferManager.get_offer_by_id(7)
+        
+        assert offer["status"] == "accepted"
+        assert mock_cursor.execute.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_cached_offers(self):
+        """Status updates drop the offer and its spec; inserts drop the spec."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchone.return_value = {"id": 7, "spec_key": "bags"}
+        mock_cursor.fetchall.return_value = [{"id": 7, "spec_key": "bags"}]
+        
+        with mock_async_db(mock_cursor):
+            await OfferManager.get_offer_by_id(7)
+            await OfferManager.get_offers_by_spec("Bags ")
+            await OfferManager.get_cheapest_offers("mugs")
+            assert offer_cache_stats()["size"] == 3
+            
+            await OfferManager.update_offer_status(7, "accepted")
+            assert offer_cache_stats()["size"] == 1
+            
+            mock_cursor.fetchone.return_value = {"id": 8}
+            await OfferManager.store_offer({"price": 2.0}, {"name": "S"}, " MUGS")
+            assert offer_cache_stats()["size"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_update_offer_statuses_validates_each_transition(self):
+        """One UPDATE for the allowed ids; the rest are reported per id."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.return_value = [
+            {"id": 1, "status": "pending", "spec_key": "bags"},
+            {"id": 2, "status": "rejected", "spec_key": "bags"},
+            {"id": 3, "status": "expired", "spec_key": "bags"},
+            {"id": 5, "status": "accepted", "spec_key": "bags"},
+        ]
+        
+        with mock_async_db(mock_cursor) as mock_conn:
+            results = await OfferManager.update_offer_statuses(
+                [1, 2, 3, 4, 5, 1], "expired"
+            )
+        
+        assert [(r["id"], r["result"]) for r in results] == [
+            (1, "updated"),
+            (2, "invalid_transition"),
+            (3, "unchanged"),
+            (4, "not_found"),
+            (5, "updated"),
+        ]
+        assert results[1]["previous_status"] == "rejected"
+        select, update = mock_cursor.execute.call_args_list
+        assert "= ANY(%s)" in select[0][0] and "FOR UPDATE" in select[0][0]
+        assert select[0][1] == ([1, 2, 3, 4, 5],)
+        assert "= ANY(%s)" in update[0][0] and update[0][1][-1] == [1, 5]
+        mock_conn.commit.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_update_offer_statuses_invalid_status(self):
+        """Unknown target statuses are rejected before touching the database."""
+        with pytest.raises(OfferError, match="Invalid status"):
+            await OfferManager.update_offer_statuses([1], "ordered")
+    
     @pytest.mark.asyncio
     async def test_update_offer_status_not_found(self):
         """Test status update for non-existent offer."""
         offer_id = 999
         status = "accepted"
         
-        mock_cursor = Mock()
+        mock_cursor = make_async_cursor()
         mock_cursor.fetchone.return_value = None
+        mock_cursor.rowcount = 0
         
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
-        
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor):
             result = await OfferManager.update_offer_status(offer_id, status)
             
             assert result is False
@@ -328,15 +729,10 @@ class TestOfferManager:
             "avg_lead_time": 14.5
         }
         
-        mock_cursor = Mock()
+        mock_cursor = make_async_cursor()
         mock_cursor.fetchone.return_value = mock_stats
         
-        mock_conn = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__.return_value = mock_conn
-        mock_conn.__exit__.return_value = None
-        
-        with patch('backend.app.offers.get_connection', return_value=mock_conn):
+        with mock_async_db(mock_cursor):
             stats = await OfferManager.get_offer_statistics()
             
             assert stats["total_offers"] == 10
@@ -347,6 +743,19 @@ class TestOfferManager:
 class TestConvenienceFunctions:
     """Test convenience functions for backward compatibility."""
     
+    @pytest.mark.asyncio
+    async def test_ensure_offer_partitions(self):
+        """Returns the partitions the SQL function created."""
+        mock_cursor = make_async_cursor()
+        mock_cursor.fetchall.return_value = [{"name": "offers_2024_08"}]
+        
+        with mock_async_db(mock_cursor) as mock_conn:
+            created = await ensure_offer_partitions(2)
+        
+        assert created == ["offers_2024_08"]
+        assert mock_cursor.execute.call_args[0][1] == (2,)
+        mock_conn.commit.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_store_offer_convenience_function(self):
         """Test the convenience store_offer function."""
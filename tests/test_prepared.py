@@ -0,0 +1,66 @@
+"""Tests for the prepared-statement registry."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.app.prepared import StatementRegistry
+
+
+class FakeConnection:
+    """Stands in for a pooled connection; only its identity matters."""
+
+
+def make_cursor(connection):
+    cursor = MagicMock()
+    cursor.connection = connection
+    cursor.execute = AsyncMock()
+    cursor.fetchone = AsyncMock()
+    return cursor
+
+
+def test_register_is_idempotent_but_rejects_conflicts():
+    registry = StatementRegistry()
+    registry.register("by_id", "SELECT 1 WHERE id = %s")
+    registry.register("by_id", "SELECT 1 WHERE id = %s")
+
+    assert "by_id" in registry
+    with pytest.raises(ValueError):
+        registry.register("by_id", "SELECT 2")
+
+
+@pytest.mark.asyncio
+async def test_execute_prepares_and_tracks_cold_and_warm_calls():
+    registry = StatementRegistry()
+    registry.register("by_id", "SELECT * FROM offers WHERE id = %s")
+    first, second = FakeConnection(), FakeConnection()
+
+    for conn in (first, first, first, second):
+        cursor = make_cursor(conn)
+        await registry.execute(cursor, "by_id", (1,))
+        cursor.execute.assert_awaited_once_with(
+            "SELECT * FROM offers WHERE id = %s", (1,), prepare=True
+        )
+
+    stats = registry.stats()["by_id"]
+    # First use on each connection is cold; later uses reuse the plan
+    assert stats["cold_calls"] == 2
+    assert stats["warm_calls"] == 2
+    assert stats["avg_warm_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_explain_reports_planning_and_execution_time():
+    registry = StatementRegistry()
+    registry.register("by_id", "SELECT * FROM offers WHERE id = %s")
+    cursor = make_cursor(FakeConnection())
+    plan = [{"Plan": {}, "Planning Time": 0.42, "Execution Time": 0.05}]
+    cursor.fetchone.return_value = {"QUERY PLAN": json.dumps(plan)}
+
+    timings = await registry.explain(cursor, "by_id", (1,))
+
+    assert timings == {"planning_ms": 0.42, "execution_ms": 0.05}
+    query = cursor.execute.await_args.args[0]
+    assert query.startswith("EXPLAIN (ANALYZE, FORMAT JSON) SELECT")
+    assert registry.stats()["by_id"]["explain"] == timings
@@ -0,0 +1,75 @@
+"""Tests for landed-cost offer ranking."""
+
+import numpy as np
+import pytest
+
+from backend.app.ranking import (
+    LandedCostConfig,
+    OfferArrays,
+    landed_cost,
+    rank_offers,
+    top_k,
+)
+
+
+def make_arrays():
+    # (id, price, currency, lead_time, minimum_order, price_usd); price_usd
+    # None: stored before migrations/012, converted at current rates
+    return OfferArrays.from_rows([
+        (1, 10.0, "USD", 10, None, 10.0),
+        (2, 9.0, "€", 0, 500, None),
+        (3, None, "USD", 1, 1, None),
+        (4, 5.0, "XYZ", 1, 1, None),
+        (5, 9.5, "", None, None, 9.5),
+        (6, 2.0, "$", 0, 1000, None),
+    ])
+
+
+def test_landed_cost_converts_currency_and_prices_lead_time():
+    config = LandedCostConfig(lead_time_cost_per_day=0.002, default_lead_time_days=30)
+    costs = landed_cost(make_arrays(), config)
+
+    assert costs[0] == pytest.approx(10.0 * 1.02)
+    assert costs[1] == pytest.approx(9.0 * 1.08)
+    assert costs[4] == pytest.approx(9.5 * 1.06)  # default lead time, USD
+    # No price or unknown currency can never win
+    assert np.isinf(costs[2]) and np.isinf(costs[3])
+
+
+def test_landed_cost_uses_the_stored_usd_price():
+    """The rate at store time wins over today's, as in cheapest-offer lookups."""
+    arrays = OfferArrays.from_rows([(1, 100.0, "EUR", 0, None, 90.0)])
+    costs = landed_cost(arrays, LandedCostConfig(rates={"EUR": 1.5}))
+
+    assert costs[0] == pytest.approx(90.0)
+
+
+def test_minimum_order_above_quantity_is_paid_for():
+    config = LandedCostConfig(quantity=100, lead_time_cost_per_day=0.0)
+    costs = landed_cost(make_arrays(), config)
+
+    assert costs[5] == pytest.approx(2.0 * 1000 / 100)
+    assert costs[1] == pytest.approx(9.0 * 1.08 * 500 / 100)
+    assert costs[0] == pytest.approx(10.0)
+
+
+def test_rank_offers_returns_cheapest_landed_cost_first():
+    config = LandedCostConfig(lead_time_cost_per_day=0.0)
+    assert [o["id"] for o in rank_offers(make_arrays(), 3, config)] == [6, 5, 2]
+
+    config = LandedCostConfig(quantity=100, lead_time_cost_per_day=0.0)
+    assert [o["id"] for o in rank_offers(make_arrays(), 3, config)] == [5, 1, 6]
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(7)
+    scores = rng.random(10_000)
+    scores[rng.integers(0, 10_000, 500)] = np.inf
+    ids = np.arange(10_000)
+
+    expected = np.argsort(scores, kind="stable")
+    for k in (1, 3, 50):
+        assert list(top_k(scores, ids, k)) == list(expected[:k])
+    # Fewer finite scores than k: only the finite ones come back
+    assert len(top_k(np.array([1.0, np.inf, 2.0]), np.arange(3), 5)) == 2
+    assert len(rank_offers(OfferArrays.from_rows([]))) == 0
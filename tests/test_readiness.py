@@ -0,0 +1,101 @@
+"""Tests for the liveness and readiness probes."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.app.readiness as readiness
+from backend.app.main import app
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    readiness._results.clear()
+    yield
+    readiness._results.clear()
+
+
+def make_checks(calls, failing=(), running=None):
+    """Fake checks; ``running`` tracks how many are in flight at once."""
+    running = running if running is not None else {"now": 0, "peak": 0}
+
+    def make(name):
+        async def check():
+            calls.append(name)
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            try:
+                await asyncio.sleep(0.05)
+            finally:
+                running["now"] -= 1
+            if name in failing:
+                raise ConnectionError(name)
+        return check
+    return {name: make(name) for name in ("database", "smtp", "imap")}
+
+
+@pytest.mark.asyncio
+async def test_checks_run_concurrently_and_are_cached():
+    calls = []
+    running = {"now": 0, "peak": 0}
+    with patch.dict(readiness.CHECKS, make_checks(calls, running=running)):
+        reports = await asyncio.gather(*(readiness.readiness() for _ in range(5)))
+        await readiness.readiness()
+
+    # One round of three overlapping checks served all six probes
+    assert sorted(calls) == ["database", "imap", "smtp"]
+    assert running["peak"] == 3
+    assert all(report["ready"] for report in reports)
+
+
+@pytest.mark.asyncio
+async def test_failed_check_marks_not_ready():
+    with patch.dict(readiness.CHECKS, make_checks([], failing={"imap"})):
+        report = await readiness.readiness()
+
+    assert report["ready"] is False
+    assert report["checks"]["imap"] == {
+        "ok": False, "error": "ConnectionError", "ms": report["checks"]["imap"]["ms"]
+    }
+    assert report["checks"]["database"]["ok"] is True
+
+
+def test_health_is_liveness_only():
+    client = TestClient(app)
+    with patch("backend.app.db.get_connection") as mock_get_conn, \
+            patch("backend.app.db.get_async_connection") as mock_get_async:
+        response = client.get("/health")
+
+    assert response.status_code == 200
+    mock_get_conn.assert_not_called()
+    mock_get_async.assert_not_called()
+
+
+def test_ready_returns_503_when_a_dependency_is_down():
+    client = TestClient(app)
+    with patch.dict(readiness.CHECKS, make_checks([], failing={"database"})):
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["detail"]["checks"]["database"]["ok"] is False
+
+
+def test_ready_returns_only_the_readiness_report():
+    client = TestClient(app)
+    with patch.dict(readiness.CHECKS, make_checks([])), \
+            patch("backend.app.main.query_latency_stats") as mock_queries:
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"ready", "checks", "checked_at"}
+    mock_queries.assert_not_called()
+
+
+def test_stats_reports_diagnostic_counters():
+    client = TestClient(app)
+    response = client.get("/stats")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"pools", "statements", "queries", "offer_cache"}
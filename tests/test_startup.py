@@ -0,0 +1,75 @@
+"""Startup-time regression checks.
+
+Imports run in a fresh interpreter so modules cached by other tests do not
+hide regressions. The budget can be raised on slow CI machines with
+``STARTUP_IMPORT_BUDGET`` (seconds).
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "1.5"))
+HEAVY_MODULES = ["openai", "serpapi", "bs4", "firebase_admin"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import backend.app.main
+import backend.agents
+import backend.suppliers
+import notifications.push
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_probe():
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_heavy_clients():
+    """LLM, search, HTML and Firebase clients are only imported on first use."""
+    assert run_probe()["loaded"] == []
+
+
+def test_import_time_within_budget():
+    """Fail when importing the app gets slower than the budget."""
+    best = min(run_probe()["seconds"] for _ in range(3))
+    assert best < IMPORT_BUDGET, f"import took {best:.2f}s (budget {IMPORT_BUDGET}s)"
+
+
+def test_lifespan_does_not_wait_for_database():
+    """Startup completes while the database is still unreachable."""
+    from backend.app import main
+
+    async def never_ready():
+        await asyncio.sleep(60)
+
+    with patch.object(main, "open_pool"), \
+            patch.object(main, "open_async_pool", AsyncMock()), \
+            patch.object(main, "close_pool"), \
+            patch.object(main, "close_async_pool", AsyncMock()), \
+            patch.object(main, "check_database_connection", never_ready):
+        start = time.perf_counter()
+        with TestClient(main.app) as client:
+            assert client.get("/health").status_code == 200
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 5
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Populate ``offers.price_usd`` for rows stored before migrations/012.
+
+Walks priced offers in id order, converts each price with
+``backend.app.fx.to_usd`` (the rate table ``store_offer`` uses) and writes
+the results back one batch per transaction, so it can be interrupted and
+resumed. Offers in a currency missing from the rate table stay NULL.
+
+Use ``--all`` to reconvert every offer, e.g. after fixing a wrong rate.
+"""
+
+import sys
+import argparse
+
+from backend.app.db import get_connection
+from backend.app.fx import FX_RATES_FILE, to_usd
+
+SELECT_SQL = """
+    SELECT id, price, currency, price_usd FROM offers
+    WHERE id > %s AND price IS NOT NULL {only_missing}
+    ORDER BY id
+    LIMIT %s
+"""
+
+UPDATE_SQL = """
+    UPDATE offers o SET price_usd = u.price_usd
+    FROM unnest(%s::bigint[], %s::numeric[]) AS u(id, price_usd)
+    WHERE o.id = u.id
+"""
+
+
+def backfill(batch_size: int, recompute: bool) -> int:
+    """Convert every matching row; return the number of rows updated."""
+    query = SELECT_SQL.format(only_missing="" if recompute else "AND price_usd IS NULL")
+    last_id = 0
+    updated = 0
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            while True:
+                cursor.execute(query, (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+                changed = []
+                for row in rows:
+                    price_usd = to_usd(row["price"], row["currency"])
+                    current = row["price_usd"]
+                    if price_usd is None:
+                        continue
+                    if current is None or float(current) != price_usd:
+                        changed.append((row["id"], price_usd))
+                if changed:
+                    ids, prices = zip(*changed)
+                    cursor.execute(UPDATE_SQL, (list(ids), list(prices)))
+                    updated += len(changed)
+                conn.commit()
+                print(f"... up to id {last_id}: {updated} rows converted")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Rows per transaction"
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="Reconvert prices that are already set"
+    )
+    args = parser.parse_args()
+
+    try:
+        print(f"Using FX rates from {FX_RATES_FILE}")
+        updated = backfill(args.batch_size, args.all)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Backfilled price_usd for {updated} offers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Populate ``offers.spec_key`` for rows stored before migrations/010.
+
+Walks ``offers`` in id order, computes ``canonical_spec(product_spec)`` in
+Python (the same normalizer ``store_offer`` uses) and writes the keys back
+one batch per transaction, so it can run against a live database and be
+interrupted and resumed. The offer_spec_summary trigger moves each row's
+counts to its key as it is updated.
+
+Use ``--all`` to recompute every key after changing ``canonical_spec``.
+"""
+
+import sys
+import argparse
+
+from backend.app.db import get_connection
+from backend.app.offers import canonical_spec
+
+SELECT_SQL = """
+    SELECT id, product_spec, spec_key FROM offers
+    WHERE id > %s {only_missing}
+    ORDER BY id
+    LIMIT %s
+"""
+
+UPDATE_SQL = """
+    UPDATE offers o SET spec_key = k.spec_key
+    FROM unnest(%s::bigint[], %s::text[]) AS k(id, spec_key)
+    WHERE o.id = k.id
+"""
+
+
+def backfill(batch_size: int, recompute: bool) -> int:
+    """Key every matching row; return the number of rows updated."""
+    query = SELECT_SQL.format(only_missing="" if recompute else "AND spec_key IS NULL")
+    last_id = 0
+    updated = 0
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            while True:
+                cursor.execute(query, (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+                changed = [
+                    (row["id"], key)
+                    for row in rows
+                    if (key := canonical_spec(row["product_spec"])) != row["spec_key"]
+                ]
+                if changed:
+                    ids, keys = zip(*changed)
+                    cursor.execute(UPDATE_SQL, (list(ids), list(keys)))
+                    updated += len(changed)
+                conn.commit()
+                print(f"... up to id {last_id}: {updated} rows keyed")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Rows per transaction"
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="Recompute keys that are already set"
+    )
+    args = parser.parse_args()
+
+    try:
+        updated = backfill(args.batch_size, args.all)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Backfilled spec_key for {updated} offers")
+
+
+if __name__ == "__main__":
+    main()
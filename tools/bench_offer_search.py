@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""Benchmark offer text search with and without trigram indexes.
+
+Fills a scratch table shaped like ``offers`` (default one million rows of
+synthetic specs, supplier names and descriptions), then runs
+``EXPLAIN ANALYZE`` for:
+
+* the old ``ILIKE '%term%'`` search without indexes (sequential scan),
+* the same search once the pg_trgm GIN indexes of migrations/008 exist,
+* the ranked fuzzy search used by ``OfferManager.search_offers``.
+
+Requires a reachable DATABASE_URL whose role may create extensions/tables.
+"""
+
+import sys
+import json
+import argparse
+
+from backend.app.db import get_connection
+from backend.app.offers import MATCH_SCORE_SQL, TEXT_MATCH_SQL
+
+TABLE = "offers_search_bench"
+
+PRODUCTS = [
+    "tote bags", "coffee mugs", "ballpoint pens", "baseball caps",
+    "water bottles", "notebooks", "umbrellas", "lanyards", "usb drives",
+    "t-shirts", "hoodies", "mouse pads", "keychains", "sticky notes",
+    "backpacks", "phone stands",
+]
+MATERIALS = [
+    "organic cotton", "recycled polyester", "bamboo", "stainless steel",
+    "ceramic", "canvas", "jute", "aluminium", "silicone", "kraft paper", "cork",
+    "nylon",
+]
+SUPPLIERS = [
+    "Green Supply Co", "Acme Promotional", "Northwind Traders",
+    "Blue Ocean Goods", "Summit Merch", "Evergreen Products", "Atlas Sourcing",
+    "Pioneer Wholesale",
+]
+
+FILL_SQL = f"""
+    INSERT INTO {TABLE}
+        (product_spec, supplier_name, product_description, created_at)
+    SELECT
+        m.v || ' ' || p.v || ' ' || (100 * (1 + g %% 50)) || ' units',
+        s.v || ' #' || (g %% 5000),
+        'Custom ' || p.v || ' in ' || m.v || ', batch ' || g,
+        now() - make_interval(secs => g)
+    FROM generate_series(1, %(rows)s) AS g,
+    LATERAL (SELECT (%(products)s::text[])[1 + g %% %(n_products)s] AS v) AS p,
+    LATERAL (
+        SELECT (%(materials)s::text[])[1 + (g / 7) %% %(n_materials)s] AS v
+    ) AS m,
+    LATERAL (
+        SELECT (%(suppliers)s::text[])[1 + (g / 3) %% %(n_suppliers)s] AS v
+    ) AS s
+"""
+
+INDEX_SQL = [
+    f"CREATE INDEX ON {TABLE} USING gin (product_spec gin_trgm_ops)",
+    f"CREATE INDEX ON {TABLE} USING gin (supplier_name gin_trgm_ops)",
+    f"CREATE INDEX ON {TABLE} USING gin (product_description gin_trgm_ops)",
+]
+
+ILIKE_SQL = f"""
+    SELECT * FROM {TABLE}
+    WHERE product_spec ILIKE %s
+       OR supplier_name ILIKE %s
+       OR product_description ILIKE %s
+    ORDER BY created_at DESC LIMIT 50
+"""
+
+RANKED_SQL = f"""
+    SELECT *, {MATCH_SCORE_SQL} AS match_score FROM {TABLE}
+    WHERE {TEXT_MATCH_SQL}
+    ORDER BY match_score DESC, created_at DESC, id DESC LIMIT 50
+"""
+
+
+def explain(cursor, query, params):
+    """Execution time (ms) and the top scan node types of ``query``."""
+    cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = []
+
+    def walk(node):
+        if "Scan" in node["Node Type"]:
+            nodes.append(node["Node Type"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return plan[0]["Execution Time"], sorted(set(nodes))
+
+
+def run(args):
+    term = args.term
+    pattern = f"%{term}%"
+    results = []
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            # Building the table and its indexes outlasts any statement timeout
+            cursor.execute("SET statement_timeout = 0")
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cursor.execute(
+                f"""
+                CREATE TABLE {TABLE} (
+                    id BIGSERIAL PRIMARY KEY,
+                    product_spec TEXT,
+                    supplier_name TEXT,
+                    product_description TEXT,
+                    created_at TIMESTAMP NOT NULL
+                )
+                """
+            )
+            print(f"Filling {TABLE} with {args.rows:,} rows...")
+            cursor.execute(
+                FILL_SQL,
+                {
+                    "rows": args.rows,
+                    "products": PRODUCTS, "n_products": len(PRODUCTS),
+                    "materials": MATERIALS, "n_materials": len(MATERIALS),
+                    "suppliers": SUPPLIERS, "n_suppliers": len(SUPPLIERS),
+                },
+            )
+            cursor.execute(f"ANALYZE {TABLE}")
+            conn.commit()
+
+            plain = explain(cursor, ILIKE_SQL, [pattern] * 3)
+            results.append(("ILIKE, no index", *plain))
+
+            print("Building trigram indexes...")
+            for statement in INDEX_SQL:
+                cursor.execute(statement)
+            cursor.execute(f"ANALYZE {TABLE}")
+            conn.commit()
+
+            indexed = explain(cursor, ILIKE_SQL, [pattern] * 3)
+            results.append(("ILIKE, trigram", *indexed))
+            ranked_params = [term] * 3 + [pattern] * 3 + [term] * 3
+            ranked = explain(cursor, RANKED_SQL, ranked_params)
+            results.append(("ranked fuzzy", *ranked))
+
+            if not args.keep:
+                cursor.execute(f"DROP TABLE {TABLE}")
+            conn.commit()
+
+    print(f"\nterm={term!r}, rows={args.rows:,}")
+    print(f"{'query':<18}{'exec ms':>12}  scans")
+    for label, ms, nodes in results:
+        print(f"{label:<18}{ms:>12.1f}  {', '.join(nodes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000, help="Rows to generate"
+    )
+    parser.add_argument("--term", default="bambo tote", help="Search term")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table")
+    args = parser.parse_args()
+
+    try:
+        run(args)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Benchmark concurrent offer lookups: blocking psycopg vs the async pool.
+
+Runs the same number of concurrent ``get_offer_by_id`` lookups twice inside
+one event loop: first the way OfferManager used to work (synchronous psycopg
+inside ``async def``), then through the async pool. Prints latency
+percentiles for both so the gain under concurrency is visible. The offer
+cache is bypassed so every async lookup reaches the database.
+
+Requires a reachable DATABASE_URL with at least one row in ``offers``.
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from psycopg.rows import dict_row
+
+from backend.app.db import (
+    close_async_pool,
+    close_pool,
+    get_connection,
+    open_async_pool,
+    open_pool,
+)
+from backend.app.offers import OfferManager, invalidate_offer
+
+
+async def blocking_get_offer_by_id(offer_id: int) -> Optional[Dict[str, Any]]:
+    """The pre-async implementation: sync psycopg called from a coroutine."""
+    with get_connection() as conn:
+        with conn.cursor(row_factory=dict_row) as cursor:
+            cursor.execute("SELECT * FROM offers WHERE id = %s", (offer_id,))
+            return cursor.fetchone()
+
+
+async def async_get_offer_by_id(offer_id: int) -> Optional[Dict[str, Any]]:
+    """OfferManager.get_offer_by_id with its cache emptied first."""
+    invalidate_offer(offer_id)
+    return await OfferManager.get_offer_by_id(offer_id)
+
+
+async def timed(call, offer_id: int) -> float:
+    start = time.perf_counter()
+    await call(offer_id)
+    return time.perf_counter() - start
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+async def run(call, offer_id: int, requests: int, concurrency: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with semaphore:
+            return await timed(call, offer_id)
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {**percentiles(samples), "rps": requests / elapsed}
+
+
+async def main_async(args) -> None:
+    open_pool(wait=True)
+    await open_async_pool(wait=True)
+    try:
+        load = (args.offer_id, args.requests, args.concurrency)
+        results = {
+            "blocking": await run(blocking_get_offer_by_id, *load),
+            "async": await run(async_get_offer_by_id, *load),
+        }
+    finally:
+        close_pool()
+        await close_async_pool()
+
+    print(f"{args.requests} lookups, concurrency {args.concurrency}")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<10}{stats['p50']:>10.2f}{stats['p95']:>10.2f}"
+            f"{stats['p99']:>10.2f}{stats['rps']:>10.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offer-id", type=int, default=1, help="Offer id to fetch")
+    parser.add_argument("--requests", type=int, default=2000, help="Total lookups")
+    parser.add_argument("--concurrency", type=int, default=50, help="In-flight lookups")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main_async(args))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
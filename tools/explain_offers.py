@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Show planning vs execution time for the prepared offer statements.
+
+Runs ``EXPLAIN ANALYZE`` for each hot offer statement to get Postgres' own
+planning and execution times, then executes the statement repeatedly on one
+pooled connection and prints the cold (first, planned) versus warm (reused
+plan) latency recorded by the statement registry.
+
+Requires a reachable DATABASE_URL with at least one row in ``offers``.
+"""
+
+import sys
+import asyncio
+import argparse
+
+from psycopg.rows import dict_row
+
+from backend.app.db import close_async_pool, get_async_connection, open_async_pool
+from backend.app.offers import OFFER_BY_ID, OFFERS_BY_SPEC, canonical_spec
+from backend.app.prepared import statements
+
+
+async def main_async(args) -> None:
+    await open_async_pool(wait=True)
+    try:
+        async with get_async_connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                cases = {
+                    OFFER_BY_ID: (args.offer_id,),
+                    OFFERS_BY_SPEC: (canonical_spec(args.spec), 50),
+                }
+                explained = {}
+                for name, params in cases.items():
+                    explained[name] = await statements.explain(cursor, name, params)
+                    for _ in range(args.repeat):
+                        await statements.execute(cursor, name, params)
+                        await cursor.fetchall()
+    finally:
+        await close_async_pool()
+
+    timings = statements.stats()
+    print(
+        f"{'statement':<18}{'plan ms':>10}{'exec ms':>10}"
+        f"{'cold ms':>10}{'warm ms':>10}"
+    )
+    for name, plan in explained.items():
+        stats = timings[name]
+        print(
+            f"{name:<18}{plan['planning_ms']:>10.3f}{plan['execution_ms']:>10.3f}"
+            f"{stats['avg_cold_ms'] or 0:>10.3f}{stats['avg_warm_ms'] or 0:>10.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offer-id", type=int, default=1, help="Offer id to fetch")
+    parser.add_argument("--spec", default="", help="Product spec to look up")
+    parser.add_argument("--repeat", type=int, default=200, help="Executions each")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main_async(args))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""Maintain the monthly offers partitions (migrations/011).
+
+Subcommands:
+
+* ``ensure`` creates the partitions for this month and the next
+  ``--months-ahead`` months (run daily from cron; the API also does this at
+  startup).
+* ``retain`` detaches every partition older than ``--keep-months`` whole
+  months. Detached partitions are moved to the ``offers_archive`` schema,
+  or dropped with ``--drop``. Their rows are subtracted from
+  offer_spec_summary in the same transaction.
+* ``explain`` runs ``EXPLAIN ANALYZE`` on the OfferManager read statements
+  and prints how many partitions each one actually touched.
+
+Requires a reachable DATABASE_URL.
+"""
+
+import re
+import sys
+import json
+import asyncio
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from psycopg import sql
+from psycopg.rows import dict_row
+
+from backend.app.db import close_async_pool, get_async_connection, open_async_pool
+from backend.app.offers import (
+    CHEAPEST_BY_SPEC,
+    OFFER_BY_ID,
+    OFFER_PARTITION_MONTHS_AHEAD,
+    OFFERS_BY_SPEC,
+    OFFERS_BY_SPEC_AFTER,
+    OfferManager,
+    canonical_spec,
+    encode_cursor,
+    ensure_offer_partitions,
+)
+from backend.app.prepared import statements
+
+ARCHIVE_SCHEMA = "offers_archive"
+PARTITION_NAME = re.compile(r"^offers_(\d{4})_(\d{2})$")
+
+PARTITIONS_SQL = """
+    SELECT c.relname AS name
+    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'offers'::regclass
+    ORDER BY c.relname
+"""
+
+
+def months_before(month: date, months: int) -> date:
+    """First day of the month ``months`` before ``month``."""
+    index = month.year * 12 + month.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def list_partitions(cursor) -> List[Tuple[str, date]]:
+    """Monthly partitions as ``(name, first day)``, oldest first."""
+    await cursor.execute(PARTITIONS_SQL)
+    partitions = []
+    for row in await cursor.fetchall():
+        match = PARTITION_NAME.match(row["name"])
+        if match:
+            year, month = map(int, match.groups())
+            partitions.append((row["name"], date(year, month, 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+async def retain(keep_months: int, drop: bool, dry_run: bool) -> List[str]:
+    """Detach partitions older than ``keep_months``; return their names."""
+    cutoff = months_before(date.today().replace(day=1), keep_months)
+    detached = []
+    async with get_async_connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cursor:
+            expired = [
+                name for name, month in await list_partitions(cursor) if month < cutoff
+            ]
+            if dry_run:
+                return expired
+            for name in expired:
+                table = sql.Identifier(name)
+                # DETACH waits for locks and the summary update scans the
+                # whole partition; neither may hit DB_STATEMENT_TIMEOUT_MS
+                await cursor.execute("SET LOCAL statement_timeout = 0")
+                # Detach first so min/max rescans no longer see these rows
+                await cursor.execute(
+                    sql.SQL("ALTER TABLE offers DETACH PARTITION {}").format(table)
+                )
+                await cursor.execute(
+                    sql.SQL(
+                        "SELECT offer_summary_apply("
+                        "COALESCE(spec_key, product_spec), status::TEXT, price, -1"
+                        ") FROM {}"
+                    ).format(table)
+                )
+                if drop:
+                    await cursor.execute(sql.SQL("DROP TABLE {}").format(table))
+                else:
+                    schema = sql.Identifier(ARCHIVE_SCHEMA)
+                    await cursor.execute(
+                        sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(schema)
+                    )
+                    await cursor.execute(
+                        sql.SQL("ALTER TABLE {} SET SCHEMA {}").format(table, schema)
+                    )
+                await conn.commit()
+                detached.append(name)
+                print(f"{'Dropped' if drop else 'Archived'} {name}")
+    return detached
+
+
+def scanned_relations(plan: Dict[str, Any]) -> Tuple[List[str], int]:
+    """Relations a plan actually read, and the subplans pruned at run time."""
+    relations = []
+    removed = 0
+
+    def walk(node):
+        nonlocal removed
+        removed += node.get("Subplans Removed", 0)
+        if "Relation Name" in node and node.get("Actual Loops", 0) > 0:
+            relations.append(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return sorted(set(relations)), removed
+
+
+async def explain(spec: str, offer_id: int, before: datetime) -> None:
+    """Print partitions touched by each OfferManager read statement."""
+    key = canonical_spec(spec)
+    token = encode_cursor({"id": 2**62, "created_at": before})
+    # Registers the listing's keyset statement with its pruning bound
+    await OfferManager.search_offers(limit=1, after=token)
+    cases = {
+        OFFER_BY_ID: (offer_id,),
+        OFFERS_BY_SPEC: (key, 50),
+        OFFERS_BY_SPEC_AFTER: (key, before, before, 2**62, 50),
+        CHEAPEST_BY_SPEC: (key, 3),
+        "offers.search:after": (before, before, 2**62, 50),
+    }
+    async with get_async_connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cursor:
+            total = len(await list_partitions(cursor)) + 1  # + offers_default
+            print(f"{'statement':<24}{'exec ms':>10}  partitions read")
+            for name, params in cases.items():
+                await cursor.execute(
+                    "EXPLAIN (ANALYZE, FORMAT JSON) " + statements.sql(name), params
+                )
+                plan = (await cursor.fetchone())["QUERY PLAN"]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                relations, removed = scanned_relations(plan[0])
+                print(
+                    f"{name:<24}{plan[0]['Execution Time']:>10.2f}  "
+                    f"{len(relations)}/{total} (pruned at run time: {removed})"
+                )
+
+
+async def main_async(args) -> None:
+    await open_async_pool(wait=True)
+    try:
+        if args.command == "ensure":
+            created = await ensure_offer_partitions(args.months_ahead)
+            print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+        elif args.command == "retain":
+            names = await retain(args.keep_months, args.drop, args.dry_run)
+            verb = "Would detach" if args.dry_run else "Detached"
+            print(f"{verb} {len(names)} partitions: {', '.join(names) or '-'}")
+        else:
+            await explain(args.spec, args.offer_id, args.before)
+    finally:
+        await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure = commands.add_parser("ensure", help="Create upcoming partitions")
+    ensure.add_argument(
+        "--months-ahead", type=int, default=OFFER_PARTITION_MONTHS_AHEAD,
+        help="Months to create beyond the current one",
+    )
+
+    retain_parser = commands.add_parser("retain", help="Detach old partitions")
+    retain_parser.add_argument(
+        "--keep-months", type=int, default=24, help="Whole months to keep"
+    )
+    retain_parser.add_argument(
+        "--drop", action="store_true", help="Drop instead of archiving"
+    )
+    retain_parser.add_argument(
+        "--dry-run", action="store_true", help="Only list what would be detached"
+    )
+
+    explain_parser = commands.add_parser("explain", help="Show partition pruning")
+    explain_parser.add_argument("--spec", default="", help="Product spec to look up")
+    explain_parser.add_argument("--offer-id", type=int, default=1, help="Offer id")
+    explain_parser.add_argument(
+        "--before",
+        type=datetime.fromisoformat,
+        default=datetime.now() - timedelta(days=180),
+        help="Keyset cursor timestamp for the page queries (ISO format)",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main_async(args))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
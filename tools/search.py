@@ -2,19 +2,36 @@
 """CLI tool for searching similar documents in the vector store."""
 
 import sys
-import pprint
-from backend.app.db import query_similar
+import argparse
+from backend.app.db import SEARCH_MODES, query_similar
 
 
 def main():
-    if len(sys.argv) < 2:  # pragma: no cover
-        print("Usage: python tools/search.py \"text to search\"")
-        print("Example: python tools/search.py \"product recommendations\"")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Search the vector store for similar documents",
+        epilog='Example: python tools/search.py "product recommendations" -k 5'
+    )
+    parser.add_argument("text", help="Text to search for")
+    parser.add_argument(
+        "-k", type=int, default=3,
+        help="Number of results to return (default: 3)"
+    )
+    parser.add_argument(
+        "--probes", type=int, default=None,
+        help="ivfflat.probes for this query; higher is slower but more accurate"
+    )
+    parser.add_argument(
+        "--mode", choices=SEARCH_MODES, default="vector",
+        help="vector: embedding similarity only; hybrid: also match exact "
+             "tokens such as part numbers (default: vector)"
+    )
+    args = parser.parse_args()
     
-    query_text = sys.argv[1]
+    query_text = args.text
     try:
-        results = query_similar(query_text)
+        results = query_similar(
+            query_text, k=args.k, probes=args.probes, mode=args.mode
+        )
         print(f"Search results for: '{query_text}'")
         print("-" * 50)
         for content, similarity in results: